@@ -1,28 +1,99 @@
 import streamlit as st
-import numpy as np
+import itertools
 import math
 import random
-import pandas as pd
+import sqlite3
+from concurrent.futures import ThreadPoolExecutor
 
-from quantum.quantum_register import QuantumRegister
 from quantum.circuit_visualizer_clean import CircuitVisualizer
-from classical.preprocessing import find_a
-from classical.continued_fraction import ContinuedFraction, ContinuedFractionConvergents
 from classical.explanations import Explanations
+from shor_runner import ShorRunner
+from streamlit.runtime.scriptrunner import RerunException, StopException
+from instrumentation import instrumented, register_control_flow_exception
+from result_store import open_store
+from auto_run import AutoRun
+
+# Limite de la saisie de N. Elle suppose qu'aucune étape ne parcourt N ou la
+# période : ordre par la fonction de Carmichael, bases tirées par le
+# BaseScheduler, backend analytique au-delà de 20 qubits (voir
+# tests/test_large_n.py).
+MAX_N = 1000000
+
+# Tentatives du mode automatique exécutées simultanément (toutes sessions
+# confondues) et intervalle de rafraîchissement de leur progression
+AUTO_MAX_ATTEMPTS = 4
+AUTO_REFRESH_SECONDS = 0.5
+ATTEMPT_STATUS_LABELS = {'running': "en cours", 'success': "succès", 'failure': "échec"}
+
+# st.rerun() et st.stop() interrompent le script sans que l'étape ait échoué
+register_control_flow_exception(RerunException, StopException)
 
 def load_css(file_name):
     with open(file_name) as f:
         st.markdown(f'<style>{f.read()}</style>', unsafe_allow_html=True)
 
+# --- Artefacts dérivés, mis en cache entre les reruns et partagés entre sessions ---
+# Les clés sont (N, a, identifiant d'exécution, étape) ; Streamlit ne hache pas
+# les paramètres préfixés par '_' (vecteurs d'état, visualiseur).
+@st.cache_resource(max_entries=32)
+def _probability_figure(n, a, run_id, stage, _visualizer, _state_vector):
+    return _visualizer.plot_probabilities(_state_vector)
+
+@st.cache_resource(max_entries=32)
+def _basis_state_figure(n, a, run_id, measurement, _visualizer):
+    return _visualizer.plot_basis_state(measurement)
+
+@st.cache_data(max_entries=256)
+def _convergent_table(n, a, run_id, measurement, _convergents):
+    return {
+        "h (numérateur)": [str(h) for h, k in _convergents],
+        "k (dénominateur)": [str(k) for h, k in _convergents],
+    }
+
+@st.cache_resource
+def _result_store():
+    # Base de résultats persistante partagée par toutes les sessions ; sans
+    # elle (disque en lecture seule...), l'application fonctionne comme avant.
+    try:
+        return open_store()
+    except (OSError, sqlite3.Error) as e:
+        print(f"Avertissement : base de résultats indisponible ({e})")
+        return None
+
+@st.cache_resource
+def _auto_executor():
+    # Pool de threads partagé : les tentatives du mode automatique s'exécutent hors du script
+    return ThreadPoolExecutor(max_workers=AUTO_MAX_ATTEMPTS, thread_name_prefix='shor-auto')
+
+@st.cache_data(max_entries=1024)
+def _base_check(n, a):
+    return ShorRunner(n).check_base(a)
+
+@st.cache_data(max_entries=256)
+def _success_probability(n, a):
+    return ShorRunner(n).success_probability(a)
+
+def _step_attributes(simulator):
+    # Attributs des spans d'instrumentation des étapes
+    return {'n': simulator.n, 'a': simulator.a, 'step': simulator.current_step}
+
 class ShorSimulator:
     def __init__(self, n=15):
+        # Toute la logique de l'algorithme est dans ShorRunner ; cette classe
+        # ne gère que l'affichage et l'enchaînement des étapes.
+        self.runner = ShorRunner(n, store=_result_store())
         self.n = n
-        self.a = find_a(self.n)
+        # Le planificateur retient toutes les bases essayées depuis le début
+        self.base_scheduler = self.runner.base_scheduler()
+        self.a = self.base_scheduler.next_base()
         self.current_step = 1
         self.is_auto_running = False
+        # Exécution automatique en cours en arrière-plan (AutoRun), sinon None
+        self.auto_run = None
         
         # Attributs pour une seule exécution
         self.quantum_register = None
+        self.run_id = None
         self.circuit_visualizer = None
         self.measurement = None
         self.state_before_measurement = None
@@ -33,18 +104,77 @@ class ShorSimulator:
         self.factor2 = None
         self.convergents = None
         self.fraction = None
+        self.extra_measurements = None
+        self.period_confidence = None
+        self.base_error = None
+
+    @property
+    def use_real_oracle(self):
+        return self.runner.use_real_oracle
+
+    @use_real_oracle.setter
+    def use_real_oracle(self, value):
+        self.runner.use_real_oracle = value
+
+    def start_auto_run(self):
+        """
+        Lance le mode automatique en arrière-plan, en commençant par la base
+        courante puis avec les bases non encore essayées.
+        """
+        self.is_auto_running = True
+        self.base_error = None
+        bases = itertools.chain([self.a], self.base_scheduler)
+        self.auto_run = AutoRun(self.n, bases, max_attempts=self.runner.max_attempts,
+                                use_real_oracle=self.use_real_oracle,
+                                phase_estimation=self.runner.phase_estimation,
+                                store=self.runner.store).submit(_auto_executor())
+
+    def stop_auto_run(self):
+        self.is_auto_running = False
+        if self.auto_run is not None:
+            self.auto_run.cancel()
+            self.auto_run = None
+
+    def _finish_auto_run(self):
+        """
+        Reporte le résultat de l'exécution automatique terminée dans les
+        étapes ; le mode automatique reste coché jusqu'à ce qu'on le décoche.
+        """
+        auto_run, self.auto_run = self.auto_run, None
+        if auto_run.status != 'success':
+            if auto_run.error:
+                self.base_error = auto_run.error
+            return
+        if auto_run.result is not None:
+            self.a = auto_run.result.a
+            self.period = auto_run.period()
+            self.measurement = auto_run.measurement()
+            self.period_search_done = True
+        self.factor1, self.factor2 = auto_run.factors
+        self.factors_calculated = True
+        self.current_step = 5
 
     def _reset_for_new_run(self):
         """Crée une nouvelle simulation pour essayer une nouvelle base 'a'."""
         new_sim = ShorSimulator(self.n)
         new_sim.is_auto_running = self.is_auto_running
-        new_sim.a = find_a(self.n, exclude=[self.a])
+        new_sim.use_real_oracle = self.use_real_oracle
+        new_sim.runner.phase_estimation = self.runner.phase_estimation
+        new_sim.base_scheduler = self.base_scheduler
+        try:
+            new_sim.a = self.base_scheduler.next_base()
+        except ValueError as e:
+            # Toutes les bases ont déjà été essayées : on reste sur la simulation courante
+            self.is_auto_running = False
+            self.base_error = str(e)
+            return
         new_sim.current_step = 2 # Recommencer à l'étape 2 avec la nouvelle base
         st.session_state.simulator = new_sim
 
     def _reset_quantum_part(self):
         """Réinitialise les résultats de la simulation quantique pour une nouvelle tentative."""
         self.quantum_register = None
+        self.run_id = None
         self.circuit_visualizer = None
         self.measurement = None
         self.state_before_measurement = None
@@ -53,6 +183,8 @@ class ShorSimulator:
         self.factors_calculated = False
         self.convergents = None
         self.fraction = None
+        self.extra_measurements = None
+        self.period_confidence = None
         self.current_step = 3
 
     # --- Logique des étapes de l'algorithme ---
@@ -66,6 +198,7 @@ class ShorSimulator:
         }
         steps[step]()
 
+    @instrumented('app.run_step_1', _step_attributes)
     def _run_step_1(self):
         st.header("Étape 1: Prétraitement Classique")
         st.markdown('<div class="card">', unsafe_allow_html=True)
@@ -77,6 +210,7 @@ class ShorSimulator:
             st.rerun()
         st.markdown('</div>', unsafe_allow_html=True)
 
+    @instrumented('app.run_step_2', _step_attributes)
     def _run_step_2(self):
         st.header("Étape 2: Vérification de la Périodicité")
         st.markdown('<div class="card">', unsafe_allow_html=True)
@@ -90,6 +224,9 @@ class ShorSimulator:
             st.balloons()
         elif is_even_period:
             st.success(f"**Succès :** La base a={self.a} est valide. La période est paire.")
+            success_probability = _success_probability(self.n, self.a)
+            if success_probability is not None:
+                st.info(f"Probabilité exacte qu'une exécution quantique avec a={self.a} donne les facteurs : **{success_probability:.1%}**.")
             if st.button("Passer à l'étape 3 (Simulation Quantique)"):
                 self.current_step = 3
                 st.rerun()
@@ -100,48 +237,73 @@ class ShorSimulator:
                 st.rerun()
         st.markdown('</div>', unsafe_allow_html=True)
 
+    @instrumented('app.run_step_3', _step_attributes)
     def _run_step_3(self):
         st.header("Étape 3: Simulation Quantique")
         st.markdown('<div class="card">', unsafe_allow_html=True)
-        num_qubits = int(np.ceil(np.log2(self.n**2)))
-        if self.quantum_register is None: self.quantum_register = QuantumRegister(num_qubits)
-        if self.circuit_visualizer is None: self.circuit_visualizer = CircuitVisualizer(num_qubits)
+        num_qubits = self.runner.num_qubits
+        known_period = self.runner.known_period(self.a) if self.measurement is None else None
+        if known_period is not None:
+            # Période déjà trouvée par une exécution précédente (base de résultats)
+            st.info(f"La période de a={self.a} pour N={self.n} est déjà connue (r = {known_period}) : "
+                    f"l'étape quantique peut être sautée.")
+            if st.button("Utiliser la période connue"):
+                self._use_known_period(known_period)
+                st.rerun()
+        if self.quantum_register is None:
+            self.quantum_register = self.runner.create_register(num_qubits, keep_state=True)
+            # Identifie cette exécution quantique dans les clés du cache
+            self.run_id = random.getrandbits(64)
+        if self.circuit_visualizer is None: self.circuit_visualizer = CircuitVisualizer(self.quantum_register.num_qubits)
+        iterative = self.runner.phase_estimation == 'iterative'
 
         col1, col2 = st.columns([2, 1])
         with col1:
-            if self.is_auto_running:
-                self._perform_quantum_simulation()
-                self.current_step = 4
-                st.rerun()
-            elif self.measurement is None:
-                self._manual_quantum_gates(num_qubits)
+            if self.measurement is None:
+                if iterative:
+                    st.write(f"Estimation de phase itérative : un qubit de contrôle réutilisé {num_qubits} fois "
+                             f"et un registre de travail de {self.quantum_register.num_qubits - 1} qubits, "
+                             f"au lieu d'un registre de comptage de {num_qubits} qubits.")
+                    if st.button("Lancer l'estimation de phase itérative"):
+                        self._perform_iterative_estimation()
+                        st.rerun()
+                else:
+                    self._manual_quantum_gates(num_qubits)
             else:
                 st.success(f"Mesure obtenue: **{self.measurement}**")
+                if iterative:
+                    bits = ''.join(str((self.measurement >> t) & 1) for t in range(num_qubits))
+                    st.write(f"Bits mesurés un à un, du poids faible au poids fort : `{bits}`")
                 st.markdown("##### Distribution de probabilité avant mesure")
                 if self.state_before_measurement is not None:
-                    prob_fig_before = self.circuit_visualizer.plot_probabilities(self.state_before_measurement)
+                    prob_fig_before = _probability_figure(self.n, self.a, self.run_id, 'before_measurement',
+                                                          self.circuit_visualizer, self.state_before_measurement)
                     if prob_fig_before:
                         st.plotly_chart(prob_fig_before, use_container_width=True)
 
-                st.markdown("##### État après mesure")
-                # Créer un vecteur d'état où seul l'état mesuré a une probabilité de 1
-                final_state_vector = np.zeros_like(self.state_before_measurement)
-                final_state_vector[self.measurement] = 1
-                prob_fig_after = self.circuit_visualizer.plot_probabilities(final_state_vector)
-                if prob_fig_after:
-                    st.plotly_chart(prob_fig_after, use_container_width=True)
+                    st.markdown("##### État après mesure")
+                    # Seul l'état mesuré a une probabilité de 1
+                    prob_fig_after = _basis_state_figure(self.n, self.a, self.run_id, self.measurement,
+                                                         self.circuit_visualizer)
+                    if prob_fig_after:
+                        st.plotly_chart(prob_fig_after, use_container_width=True)
+                elif iterative:
+                    st.info("En estimation itérative, le registre de comptage n'existe jamais : il n'y a pas de distribution à afficher.")
+                else:
+                    st.info("Registre trop grand pour afficher la distribution complète : les mesures sont tirées de la formule analytique.")
 
         with col2:
             st.subheader("Circuit Quantique")
             circuit_fig = self.circuit_visualizer.show_circuit()
             st.plotly_chart(circuit_fig, use_container_width=True)
 
-        if self.measurement is not None and not self.is_auto_running:
+        if self.measurement is not None:
             if st.button("Passer à l'étape 4 (Recherche de Période)"):
                 self.current_step = 4
                 st.rerun()
         st.markdown('</div>', unsafe_allow_html=True)
 
+    @instrumented('app.run_step_4', _step_attributes)
     def _run_step_4(self):
         st.header("Étape 4: Recherche de la Période")
         st.markdown('<div class="card">', unsafe_allow_html=True)
@@ -155,34 +317,32 @@ class ShorSimulator:
                 st.write(f"Fraction s/Q calculée à partir de la mesure: {self.fraction:.5f}")
             if self.convergents is not None:
                 st.write("Convergents (h/k) de la fraction continue:")
-                df_convergents = pd.DataFrame(self.convergents, columns=["h (numérateur)", "k (dénominateur)"])
-                st.dataframe(df_convergents.astype(str))
+                st.dataframe(_convergent_table(self.n, self.a, self.run_id, self.measurement, self.convergents))
 
         if self.period:
             st.success(f"**Succès :** La période 'r' trouvée est **{self.period}**.")
-            if self.is_auto_running:
-                self.current_step = 5
-                st.rerun()
-            elif st.button("Passer à l'étape 5 (Calcul des Facteurs)"):
+            if self.extra_measurements:
+                st.info(f"La première mesure ne suffisait pas : {len(self.extra_measurements)} nouvelle(s) exécution(s) "
+                        f"quantique(s) complète(s) ont été lancées, et la période a été obtenue en combinant "
+                        f"{len(self.extra_measurements) + 1} mesures ({', '.join(map(str, [self.measurement] + self.extra_measurements))}), "
+                        f"confiance {self.period_confidence:.0%}.")
+            if st.button("Passer à l'étape 5 (Calcul des Facteurs)"):
                 self.current_step = 5
                 st.rerun()
         else:
             st.error("**Échec :** La recherche de la période a échoué. Cela peut arriver si la mesure est 0 ou donne une mauvaise approximation de la période.")
-            if self.is_auto_running:
-                self._reset_for_new_run()
-                st.rerun()
-            else:
-                col1, col2 = st.columns(2)
-                with col1:
-                    if st.button("Réessayer la mesure quantique"):
-                        self._reset_quantum_part()
-                        st.rerun()
-                with col2:
-                    if st.button("Essayer une nouvelle base (a)"):
-                        self._reset_for_new_run()
-                        st.rerun()
+            col1, col2 = st.columns(2)
+            with col1:
+                if st.button("Réessayer la mesure quantique"):
+                    self._reset_quantum_part()
+                    st.rerun()
+            with col2:
+                if st.button("Essayer une nouvelle base (a)"):
+                    self._reset_for_new_run()
+                    st.rerun()
         st.markdown('</div>', unsafe_allow_html=True)
 
+    @instrumented('app.run_step_5', _step_attributes)
     def _run_step_5(self):
         st.header("Étape 5: Calcul des Facteurs")
         st.markdown('<div class="card">', unsafe_allow_html=True)
@@ -196,21 +356,14 @@ class ShorSimulator:
             st.success(f"## Les facteurs de {self.n} sont **{self.factor1}** et **{self.factor2}**!")
         else:
             st.warning("**Échec :** Le calcul a donné un facteur trivial.")
-            if self.is_auto_running:
-                self._reset_for_new_run()
-                st.rerun()
-            elif st.button("Essayer une nouvelle base"):
+            if st.button("Essayer une nouvelle base"):
                 self._reset_for_new_run()
                 st.rerun()
         st.markdown('</div>', unsafe_allow_html=True)
 
     # --- Méthodes de calcul auxiliaires ---
     def _check_periodicity(self):
-        is_coprime = math.gcd(self.a, self.n) == 1
-        if not is_coprime: return False, False
-        r = 1
-        while pow(self.a, r, self.n) != 1: r += 1
-        return True, r % 2 == 0
+        return _base_check(self.n, self.a)
 
     def _manual_quantum_gates(self, num_qubits):
         with st.expander("Explication des portes quantiques", expanded=True):
@@ -220,65 +373,97 @@ class ShorSimulator:
             self.circuit_visualizer.add_gate('H', list(range(num_qubits)), 1)
             st.rerun()
         if st.button("Appliquer Oracle"):
-            self.quantum_register.apply_oracle(self.a, self.n)
+            self.runner.apply_oracle(self.quantum_register, self.a)
             self.circuit_visualizer.add_gate('O', list(range(num_qubits)), 3)
             st.rerun()
         if st.button("Appliquer IQFT"):
-            self.quantum_register.apply_iqft()
-            self.circuit_visualizer.add_gate('IQFT', list(range(num_qubits)), 5)
-            st.rerun()
+            try:
+                self.quantum_register.apply_iqft()
+            except ValueError as e:
+                # Backend analytique : toutes les séquences de portes n'ont pas de forme fermée
+                st.warning(str(e))
+            else:
+                self.circuit_visualizer.add_gate('IQFT', list(range(num_qubits)), 5)
+                st.rerun()
         if st.button("Mesurer"):
             self._perform_measurement(num_qubits)
             st.rerun()
 
     def _perform_measurement(self, num_qubits):
-        self.state_before_measurement = self.quantum_register.get_state_vector()
-
-        max_retries = 20 # Sécurité pour éviter une boucle infinie
-        measurement = 0
-        for i in range(max_retries):
-            measurement = self.quantum_register.measure()
-            if measurement != 0:
-                break # On a trouvé une mesure potentiellement utile
-        
-        self.measurement = measurement
+        # Le backend analytique n'a pas de vecteur d'état à afficher
+        if self.quantum_register.backend != 'analytic':
+            self.state_before_measurement = self.quantum_register.get_state_vector()
+
+        self.measurement = self.runner.measure(self.quantum_register)
         self.circuit_visualizer.add_gate('M', list(range(num_qubits)), 7)
 
-    def _perform_quantum_simulation(self):
-        num_qubits = self.quantum_register.num_qubits
-        self.quantum_register.apply_hadamard_to_all()
-        self.circuit_visualizer.add_gate('H', list(range(num_qubits)), 1)
-        self.quantum_register.apply_oracle(self.a, self.n)
-        self.circuit_visualizer.add_gate('O', list(range(num_qubits)), 3)
-        self.quantum_register.apply_iqft()
-        self.circuit_visualizer.add_gate('IQFT', list(range(num_qubits)), 5)
-        self._perform_measurement(num_qubits)
+    def _perform_iterative_estimation(self):
+        register_qubits = self.quantum_register.num_qubits
+        self.circuit_visualizer.add_gate('H', [0], 1)
+        self.circuit_visualizer.add_gate('U^2^k', list(range(register_qubits)), 3)
+        self.circuit_visualizer.add_gate('R', [0], 5)
+        self.circuit_visualizer.add_gate('M', [0], 7)
+        self.measurement = self.runner.run_iterative(self.quantum_register, self.a)
 
+    @instrumented('app.find_period', _step_attributes)
     def _find_period(self):
         self.period_search_done = True
-        num_qubits = self.quantum_register.num_qubits
-        self.fraction = self.measurement / (2**num_qubits)
-        cf = ContinuedFraction(self.fraction)
-        self.convergents = ContinuedFractionConvergents(cf.get_coefficients()).get_convergents()
-        for h, k in self.convergents:
-            if k < self.n and pow(self.a, k, self.n) == 1:
-                self.period = k
-                return
+        num_qubits = self.runner.num_qubits
+        self.period, self.fraction, self.convergents = self.runner.find_period(
+            self.a, self.measurement, num_qubits)
+        if self.period is None and self.runner.shots > 1:
+            # Le registre affiché à l'étape 3 a déjà été mesuré : chaque mesure
+            # supplémentaire est une nouvelle exécution complète (Hadamard,
+            # oracle, IQFT), lancée tant que la période n'est pas retrouvée.
+            measurements = [self.measurement]
+            for _ in range(self.runner.shots - 1):
+                register = self.runner.create_register()
+                measurements.append(int(self.runner.run_quantum(register, self.a)))
+                self.period, self.period_confidence, _ = self.runner.recover_period(
+                    self.a, measurements, num_qubits)
+                if self.period is not None:
+                    break
+            self.extra_measurements = measurements[1:]
+
+    def _use_known_period(self, period):
+        self.period = period
+        self.period_search_done = True
+        self.current_step = 5
 
+    @instrumented('app.calculate_factors', _step_attributes)
     def _calculate_factors(self):
         self.factors_calculated = True
-        if self.period is None or self.period % 2 != 0:
-            self.factor1, self.factor2 = None, None
-            return
-        x = pow(self.a, self.period // 2, self.n)
-        if x == self.n - 1:
-            self.factor1, self.factor2 = None, None
-            return
-        self.factor1 = math.gcd(x + 1, self.n)
-        self.factor2 = math.gcd(x - 1, self.n)
+        self.factor1, self.factor2 = self.runner.calculate_factors(self.a, self.period)
+        if self.factor1 and self.factor2 and self.factor1 * self.factor2 == self.n:
+            self.runner.record_result(self.a, self.period, (self.factor1, self.factor2))
 
 
 
+@st.fragment(run_every=AUTO_REFRESH_SECONDS)
+def _auto_progress():
+    # Seul ce fragment est réexécuté pendant le calcul en arrière-plan
+    simulator = st.session_state.simulator
+    auto_run = simulator.auto_run
+    if auto_run is None:
+        return
+    if auto_run.done:
+        simulator._finish_auto_run()
+        st.rerun()
+    snapshot = auto_run.snapshot()
+    st.header("Mode automatique")
+    st.markdown('<div class="card">', unsafe_allow_html=True)
+    st.write(f"Factorisation de **{simulator.n}** en arrière-plan : {len(snapshot['attempts'])} base(s) "
+             f"essayée(s), {snapshot['elapsed']:.1f} s écoulées.")
+    if snapshot['attempts']:
+        st.dataframe({
+            "Base a": [attempt['a'] for attempt in snapshot['attempts']],
+            "Statut": [ATTEMPT_STATUS_LABELS[attempt['status']] + (f" ({attempt['failure_reason']})" if attempt['failure_reason'] else "")
+                       for attempt in snapshot['attempts']],
+            "Étapes terminées": [", ".join(stage['name'] for stage in attempt['stages']) for attempt in snapshot['attempts']],
+            "Durée (ms)": [round(1000 * sum(stage['duration'] for stage in attempt['stages']), 1) for attempt in snapshot['attempts']],
+        })
+    st.markdown('</div>', unsafe_allow_html=True)
+
 # --- Exécution principale de l'application ---
 def main():
     st.set_page_config(layout="wide", page_title="Simulateur d'Algorithme de Shor", page_icon="utc/image.png")
@@ -291,18 +476,39 @@ def main():
     st.sidebar.title("Simulateur d'Algorithme de Shor")
     st.sidebar.markdown("---_Tx n°7708 Simulateur pour l'algorithme de Shor_---")
     
-    new_n = st.sidebar.number_input("Nombre à factoriser (N)", min_value=15, max_value=100, value=simulator.n, step=2)
+    new_n = st.sidebar.number_input("Nombre à factoriser (N)", min_value=15, max_value=MAX_N, value=simulator.n, step=2)
     if new_n != simulator.n:
+        simulator.stop_auto_run()
         st.session_state.simulator = ShorSimulator(n=new_n)
         st.rerun()
 
     if st.sidebar.button("Recommencer de Zéro"):
+        simulator.stop_auto_run()
         st.session_state.simulator = ShorSimulator()
         st.rerun()
 
     is_auto_running = st.sidebar.checkbox("Mode automatique", value=simulator.is_auto_running)
     if is_auto_running != simulator.is_auto_running:
-        simulator.is_auto_running = is_auto_running
+        if is_auto_running:
+            simulator.start_auto_run()
+        else:
+            simulator.stop_auto_run()
+        st.rerun()
+
+    use_real_oracle = st.sidebar.checkbox("Oracle réel (exponentiation modulaire)", value=simulator.use_real_oracle,
+                                          help="Applique U|x>|y> = |x>|y·a^x mod N> sur un registre de travail au lieu de calculer la période classiquement.")
+    if use_real_oracle != simulator.use_real_oracle:
+        simulator.use_real_oracle = use_real_oracle
+        st.rerun()
+
+    iterative = st.sidebar.checkbox("Estimation de phase itérative (1 qubit de contrôle)",
+                                    value=simulator.runner.phase_estimation == 'iterative',
+                                    help="Remplace le registre de comptage et l'IQFT par un seul qubit de contrôle réutilisé : seul le registre de travail est simulé.")
+    if iterative != (simulator.runner.phase_estimation == 'iterative'):
+        simulator.runner.phase_estimation = 'iterative' if iterative else 'standard'
+        if simulator.current_step >= 3:
+            # Le registre déjà créé ne correspond plus au mode choisi
+            simulator._reset_quantum_part()
         st.rerun()
 
     st.sidebar.markdown("---")
@@ -310,7 +516,12 @@ def main():
     st.sidebar.markdown("_Responsable_ : <br> Ahmed LOUNIS <br><br> _Superviseur_ : <br> Vincent ROBIN", unsafe_allow_html=True)
     st.sidebar.image("utc/image.png")
 
-    simulator.run_step(simulator.current_step)
+    if simulator.base_error:
+        st.error(simulator.base_error)
+    if simulator.auto_run is not None:
+        _auto_progress()
+    else:
+        simulator.run_step(simulator.current_step)
 
 if __name__ == "__main__":
     main()
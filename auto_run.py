@@ -0,0 +1,237 @@
+"""
+Exécution en arrière-plan du mode automatique de l'application.
+
+Une AutoRun enchaîne prétraitement et tentatives (ShorRunner.run_attempt)
+hors du script Streamlit : l'interface ne fait que lire périodiquement
+snapshot(). Plusieurs bases sont essayées en même temps (parallel_attempts) ;
+la première tentative réussie termine l'exécution. Aucune dépendance à
+streamlit : le pool de threads est fourni par l'appelant (dans
+l'application, un ThreadPoolExecutor partagé via st.cache_resource).
+
+Chaque tentative est une tâche de ce pool, et la fin d'une tentative soumet
+la suivante : aucun thread n'attend les autres, et le nombre de tentatives
+exécutées en même temps, toutes exécutions confondues, est borné par la
+taille du pool.
+"""
+import itertools
+import threading
+import time
+
+from shor_runner import ShorRunner
+
+# Nombre de bases essayées simultanément par une exécution automatique
+PARALLEL_ATTEMPTS = 2
+
+FINAL_STATUSES = ('success', 'failure', 'cancelled', 'error')
+
+
+class AutoRun:
+    def __init__(self, n, bases, max_attempts=20, parallel_attempts=PARALLEL_ATTEMPTS, **runner_options):
+        """
+        Prépare une exécution automatique (lancée par submit).
+
+        Args:
+            n: Le nombre à factoriser
+            bases: Un itérable des bases à essayer, dans l'ordre (par exemple
+                le BaseScheduler de l'application)
+            max_attempts: Le nombre maximal de bases essayées
+            parallel_attempts: Le nombre de tentatives soumises en même temps
+            runner_options: Les options de ShorRunner (use_real_oracle,
+                phase_estimation, store...)
+        """
+        self.n = n
+        self.bases = bases
+        self.max_attempts = max_attempts
+        self.parallel_attempts = parallel_attempts
+        self.runner = ShorRunner(n, max_attempts=max_attempts, on_stage=self._record_stage, **runner_options)
+        self.status = 'pending'
+        self.result = None
+        self.method = None
+        self.factors = None
+        self.error = None
+        self._executor = None
+        self._bases = iter(())
+        self._futures = set()
+        # Tâches soumises dont l'ordonnancement final n'a pas encore eu lieu
+        self._pending = 0
+        self._attempts = {}
+        self._start = None
+        self._end = None
+        # _lock protège l'état lu par snapshot(), _schedule_lock l'ordonnancement.
+        # Réentrant : les callbacks d'un future annulé ou déjà terminé
+        # s'exécutent dans le thread qui le manipule.
+        self._lock = threading.Lock()
+        self._schedule_lock = threading.RLock()
+        self._cancelled = threading.Event()
+        self._finished = threading.Event()
+
+    def submit(self, executor):
+        """Lance l'exécution sur un pool de threads ; retourne self."""
+        self._executor = executor
+        self._start = time.perf_counter()
+        self.status = 'running'
+        with self._schedule_lock:
+            self._submit(self._prepare)
+        return self
+
+    def cancel(self):
+        """
+        Demande l'arrêt : les tentatives pas encore commencées sont retirées
+        du pool, celles en cours s'arrêtent avant leur étape suivante.
+        """
+        self._cancelled.set()
+        with self._schedule_lock:
+            for future in list(self._futures):
+                if future.cancel():
+                    self._pending -= 1
+            self._finish_if_idle()
+
+    @property
+    def done(self):
+        return self.status in FINAL_STATUSES
+
+    def wait(self, timeout=None):
+        """Attend la fin de l'exécution ; retourne True si elle est terminée."""
+        return self._finished.wait(timeout)
+
+    def _record_stage(self, attempt, stage):
+        with self._lock:
+            self._attempts[attempt.a]['stages'].append({'name': stage.name, 'duration': stage.duration})
+
+    def _set_attempt(self, a, **values):
+        with self._lock:
+            entry = self._attempts.setdefault(a, {'a': a, 'status': 'running', 'stages': [], 'failure_reason': None})
+            entry.update(values)
+
+    def snapshot(self):
+        """
+        État courant, copié sous verrou : statut, durée écoulée et, pour
+        chaque tentative, son statut et ses étapes terminées.
+        """
+        with self._lock:
+            end = self._end or time.perf_counter()
+            return {
+                'status': self.status,
+                'elapsed': end - self._start if self._start else 0.0,
+                'attempts': [dict(entry, stages=list(entry['stages'])) for entry in self._attempts.values()],
+                'factors': self.factors,
+                'method': self.method,
+                'error': self.error,
+            }
+
+    def _finish(self, status, result=None, method=None, factors=None, error=None):
+        """Fixe le statut final ; sans effet si l'exécution est déjà terminée."""
+        with self._lock:
+            if self.status in FINAL_STATUSES:
+                return
+            self.status = status
+            self.result = result
+            self.method = method
+            self.factors = factors
+            self.error = error
+            self._end = time.perf_counter()
+        self._finished.set()
+
+    def _submit(self, function, *args):
+        """Soumet une tâche au pool. Appelée sous _schedule_lock."""
+        future = self._executor.submit(function, *args)
+        self._pending += 1
+        self._futures.add(future)
+        future.add_done_callback(self._forget)
+
+    def _forget(self, future):
+        with self._schedule_lock:
+            self._futures.discard(future)
+
+    def _submit_next(self):
+        """
+        Soumet la tentative suivante, sauf si l'exécution est terminée ou
+        annulée. Appelée sous _schedule_lock.
+        """
+        if self.done or self._cancelled.is_set():
+            return
+        a = next(self._bases, None)
+        if a is None:
+            return
+        self._set_attempt(a)
+        try:
+            self._submit(self._run_attempt, a)
+        except RuntimeError as e:
+            # Pool arrêté (fin du processus)
+            self._set_attempt(a, status='failure', failure_reason='error')
+            self._finish('error', error=str(e))
+
+    def _finish_if_idle(self):
+        """
+        Termine l'exécution quand plus aucune tâche n'est en cours. Appelée
+        sous _schedule_lock.
+        """
+        if self._pending or self.done:
+            return
+        if self._cancelled.is_set():
+            self._finish('cancelled')
+        else:
+            self._finish('failure', error=f"Aucune des {len(self._attempts)} bases essayées n'a donné de facteurs")
+
+    def _task_done(self, submit_count):
+        """Fin d'une tâche : soumet les tentatives suivantes ou termine l'exécution."""
+        with self._schedule_lock:
+            self._pending -= 1
+            for _ in range(submit_count):
+                self._submit_next()
+            self._finish_if_idle()
+
+    def _prepare(self):
+        try:
+            preprocessing = self.runner.preprocess()
+            if not preprocessing.output['is_valid']:
+                factors = preprocessing.output['factors']
+                if factors:
+                    self._finish('success', method='classical', factors=tuple(sorted(factors)))
+                else:
+                    self._finish('failure', error=f"N={self.n} n'est pas un candidat valide pour l'algorithme de Shor")
+                return
+            known = self.runner.known_factors()
+            if known is not None:
+                self._finish('success', method='store', factors=tuple(known['factors']))
+                return
+            self._bases = itertools.islice(iter(self.bases), self.max_attempts)
+        except Exception as e:
+            self._finish('error', error=str(e))
+        finally:
+            self._task_done(self.parallel_attempts)
+
+    def _run_attempt(self, a):
+        try:
+            if self._cancelled.is_set() or self.done:
+                self._set_attempt(a, status='failure', failure_reason='cancelled')
+                return
+            attempt = self.runner.run_attempt(a, cancelled=self._cancelled)
+            self._set_attempt(a, status='success' if attempt.success else 'failure',
+                              failure_reason=attempt.failure_reason)
+            if attempt.success:
+                self._finish('success', attempt, attempt.method, tuple(sorted(attempt.factors)))
+        except Exception as e:
+            self._set_attempt(a, status='failure', failure_reason='error')
+            self._finish('error', error=str(e))
+        finally:
+            self._task_done(1)
+
+    def period(self):
+        """Période de la tentative réussie, ou None."""
+        if self.result is None:
+            return None
+        # Une tentative peut décoder plusieurs fois (une par exécution quantique) : la dernière a réussi
+        for stage in reversed(self.result.stages):
+            if stage.name == 'period_finding':
+                return stage.output['period']
+        return None
+
+    def measurement(self):
+        """Mesure de la tentative réussie (None si la période était déjà connue)."""
+        if self.result is None:
+            return None
+        for stage in self.result.stages:
+            if stage.name == 'quantum':
+                return stage.output['measurement']
+        return None
@@ -0,0 +1,157 @@
+import argparse
+import json
+import os
+import random
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+
+import numpy as np
+from sympy import isprime, perfect_power
+
+from result_store import open_store
+from shor_runner import ShorRunner
+
+
+def odd_composites(max_n, min_n=15, perfect_powers=False):
+    """
+    Retourne les entiers impairs composés de [min_n, max_n).
+
+    Les puissances parfaites (25, 27, 49...) sont exclues par défaut : le
+    prétraitement les factorise sans étape quantique, elles ne mesurent donc
+    rien de l'algorithme de Shor.
+    """
+    start = min_n if min_n % 2 == 1 else min_n + 1
+    return [n for n in range(start, max_n, 2)
+            if not isprime(n) and (perfect_powers or not perfect_power(n))]
+
+
+def _init_worker(base_seed):
+    """
+    Initialise les générateurs aléatoires de chaque processus : sans cela, les
+    processus créés par fork partageraient le même état et produiraient les
+    mêmes tirages.
+    """
+    seed = (base_seed + os.getpid()) % 2**32
+    random.seed(seed)
+    np.random.seed(seed)
+
+
+def run_job(n, seed, max_attempts=20, classical_shortcuts=False, store_path=None):
+    """
+    Factorise N avec une graine donnée et retourne un résumé sérialisable.
+    Avec store_path, la base de résultats persistante est consultée d'abord
+    (un N déjà factorisé ne repasse pas par l'étape quantique : méthode
+    'store', qui ne dit rien du taux de succès de cette graine).
+    """
+    store = open_store(store_path) if store_path else None
+    result = ShorRunner(n, max_attempts=max_attempts, seed=seed, classical_shortcuts=classical_shortcuts,
+                        store=store).run()
+    return {
+        'n': n,
+        'seed': seed,
+        'valid': result.preprocessing.output['is_valid'],
+        'success': result.success,
+        'factors': list(result.factors) if result.factors else None,
+        'method': result.method,
+        'attempts': len(result.attempts),
+        'quantum_runs': sum(1 for attempt in result.attempts
+                            for stage in attempt.stages if stage.name == 'quantum'),
+        'duration': result.total_duration,
+    }
+
+
+def factor_batch(jobs, workers=None, max_in_flight=None, max_attempts=20, base_seed=0,
+                 classical_shortcuts=False, store_path=None):
+    """
+    Factorise une liste de couples (N, graine) sur un pool de processus.
+
+    Les résultats sont produits au fil de l'eau, dans l'ordre de fin des
+    calculs. Au plus max_in_flight tâches sont soumises à la fois, pour que la
+    mémoire reste bornée même avec des millions de couples.
+
+    Args:
+        jobs: Un itérable de couples (N, graine)
+        workers: Le nombre de processus (nombre de cœurs par défaut)
+        max_in_flight: Le nombre maximal de tâches en cours (4 par processus par défaut)
+        max_attempts: Le nombre maximal de bases essayées par factorisation
+        base_seed: La graine de base des générateurs de chaque processus
+        classical_shortcuts: Extraire d'abord les facteurs bon marché (voir ShorRunner)
+        store_path: Le fichier de la base de résultats persistante (aucune par défaut)
+
+    Yields:
+        dict: Le résumé de chaque factorisation (voir run_job)
+    """
+    workers = workers or os.cpu_count() or 1
+    max_in_flight = max_in_flight or 4 * workers
+    jobs = iter(jobs)
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(base_seed,)) as executor:
+        pending = set()
+        exhausted = False
+        while pending or not exhausted:
+            while not exhausted and len(pending) < max_in_flight:
+                try:
+                    n, seed = next(jobs)
+                except StopIteration:
+                    exhausted = True
+                    break
+                pending.add(executor.submit(run_job, n, seed, max_attempts, classical_shortcuts, store_path))
+            if not pending:
+                break
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                yield future.result()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Factorise tous les entiers impairs composés d'un intervalle et mesure le taux de succès.")
+    parser.add_argument('--max-n', type=int, required=True, help="Borne supérieure (exclue) des N")
+    parser.add_argument('--min-n', type=int, default=15, help="Borne inférieure des N (15 par défaut)")
+    parser.add_argument('--seeds', type=int, default=1, help="Nombre de graines (exécutions) par N")
+    parser.add_argument('--workers', type=int, default=None, help="Nombre de processus")
+    parser.add_argument('--max-in-flight', type=int, default=None, help="Nombre maximal de tâches en cours")
+    parser.add_argument('--max-attempts', type=int, default=20, help="Nombre maximal de bases par factorisation")
+    parser.add_argument('--classical-shortcuts', action='store_true',
+                        help="Extraire d'abord les facteurs bon marché (petits premiers, Pollard rho)")
+    parser.add_argument('--perfect-powers', action='store_true',
+                        help="Inclure les puissances parfaites (factorisées par le prétraitement)")
+    parser.add_argument('--store', default=None,
+                        help="Base de résultats SQLite à consulter et compléter (aucune par défaut). Les N déjà "
+             "factorisés y sont relus sans étape quantique et sont exclus du taux de succès")
+    parser.add_argument('--output', default=None, help="Fichier JSONL de sortie (sortie standard par défaut)")
+    args = parser.parse_args(argv)
+
+    jobs = ((n, seed) for n in odd_composites(args.max_n, args.min_n, args.perfect_powers)
+            for seed in range(args.seeds))
+    output = open(args.output, 'w') if args.output else sys.stdout
+    total = successes = classical = stored = 0
+    start = time.perf_counter()
+    try:
+        for record in factor_batch(jobs, args.workers, args.max_in_flight, args.max_attempts,
+                                   classical_shortcuts=args.classical_shortcuts, store_path=args.store):
+            output.write(json.dumps(record) + '\n')
+            output.flush()
+            if record['method'] == 'classical':
+                # Factorisé par le prétraitement : compté à part du taux de succès de Shor
+                classical += 1
+                continue
+            if record['method'] == 'store':
+                # Relu dans la base de résultats : aucune exécution ne mesure le taux de succès
+                stored += 1
+                continue
+            total += 1
+            successes += record['success']
+    finally:
+        if output is not sys.stdout:
+            output.close()
+
+    elapsed = time.perf_counter() - start
+    rate = successes / total if total else 0.0
+    print(f"{total} factorisations, taux de succès {rate:.1%}, "
+          f"{classical} factorisations par le prétraitement classique, "
+          f"{stored} relues dans la base de résultats, {elapsed:.2f} s", file=sys.stderr)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,219 @@
+"""
+Micro-benchmarks du registre quantique et de la chaîne classique.
+
+Chaque cas est exécuté pour plusieurs tailles (nombre de qubits ou valeur de
+N). Pour chacun, on mesure le temps d'exécution (meilleur et médiane de
+plusieurs répétitions, préparation exclue) et le pic mémoire (tracemalloc,
+qui suit aussi les allocations de numpy).
+
+Usage :
+    python benchmarks/bench_core.py run [--save] [--filter apply_iqft]
+    python benchmarks/bench_core.py compare [--time-tolerance 2.0] [--memory-tolerance 1.2]
+
+``run --save`` enregistre les mesures comme référence dans
+benchmarks/baselines.json ; ``compare`` relance les mesures et signale (code
+de sortie 1) tout cas plus lent ou plus gourmand que la référence au-delà
+des tolérances.
+
+La référence doit être régénérée (``run --save``) dans chaque modification
+d'un chemin mesuré, sans quoi ``compare`` juge par rapport à des chiffres périmés.
+"""
+import argparse
+import json
+import os
+import platform
+import random
+import statistics
+import sys
+import time
+import tracemalloc
+
+import numpy as np
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from quantum.quantum_register import QuantumRegister
+from classical import decode_index, order
+from classical.continued_fraction import ContinuedFraction, ContinuedFractionConvergents
+from classical.preprocessing import Preprocessor, find_a
+
+BASELINE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'baselines.json')
+
+
+def _num_qubits(n):
+    return int(np.ceil(np.log2(n**2)))
+
+
+def _register_after(num_qubits, n=None, stage='zero'):
+    """
+    Prépare un registre arrivé à une étape donnée du circuit.
+    """
+    random.seed(0)
+    np.random.seed(0)
+    register = QuantumRegister(num_qubits)
+    if stage in ('uniform', 'periodic', 'fourier'):
+        register.apply_hadamard_to_all()
+    if stage in ('periodic', 'fourier'):
+        register.apply_oracle(2, n)
+    if stage == 'fourier':
+        register.apply_iqft()
+    return register
+
+
+def _fraction(n):
+    """Une mesure typique s/Q pour N : un pic proche de Q/7."""
+    Q = 2**_num_qubits(n)
+    return (Q // 7) / Q
+
+
+# Chaque cas : (nom, paramètres, préparation(paramètre) -> contexte, fonction(contexte))
+CASES = [
+    ('apply_hadamard', [10, 14, 18],
+     lambda q: _register_after(q, stage='uniform'),
+     lambda register: register.apply_hadamard(register.num_qubits // 2)),
+    ('apply_hadamard_to_all', [10, 14, 18, 20],
+     lambda q: QuantumRegister(q),
+     lambda register: register.apply_hadamard_to_all()),
+    ('apply_oracle', [15, 91, 221, 899],
+     lambda n: (_register_after(_num_qubits(n), stage='uniform'), n),
+     lambda context: context[0].apply_oracle(2, context[1])),
+    ('apply_iqft', [15, 91, 221, 899],
+     lambda n: _register_after(_num_qubits(n), n, stage='periodic'),
+     lambda register: register.apply_iqft()),
+    ('measure', [15, 91, 221, 899],
+     lambda n: _register_after(_num_qubits(n), n, stage='fourier'),
+     lambda register: register.measure()),
+    ('measure_1000_shots', [15, 91, 221, 899],
+     lambda n: _register_after(_num_qubits(n), n, stage='fourier'),
+     lambda register: register.measure(shots=1000)),
+    ('ContinuedFraction', [15, 91, 899, 1000003],
+     _fraction,
+     lambda fraction: ContinuedFraction(fraction)),
+    ('ContinuedFractionConvergents', [15, 91, 899, 1000003],
+     lambda n: ContinuedFraction(_fraction(n)).get_coefficients(),
+     lambda coefficients: ContinuedFractionConvergents(coefficients)),
+    ('find_a', [91, 899, 9991, 99991],
+     lambda n: n,
+     lambda n: find_a(n)),
+    ('Preprocessor.validate_number', [91, 899, 9991, 999983 * 1000003],
+     lambda n: n,
+     lambda n: Preprocessor(n).validate_number()),
+]
+
+
+def _clear_caches():
+    """
+    Vide les caches indexés par (a, N) : ordres, factorisations, tables de
+    décodage. Sans cela, seule la première répétition calculerait l'ordre et
+    les suivantes ne mesureraient qu'une lecture de cache. Le crible des
+    petits premiers, indépendant du cas mesuré, reste en cache.
+    """
+    order.multiplicative_order.cache_clear()
+    order.carmichael.cache_clear()
+    order._factorize.cache_clear()
+    with decode_index._cache_lock:
+        decode_index._cache.clear()
+
+
+def measure_case(setup, function, parameter, repeat):
+    """
+    Mesure un cas : temps (meilleur et médiane, en secondes) et pic mémoire (octets).
+    Les caches sont vidés après la préparation, avant chaque mesure.
+    """
+    timings = []
+    for _ in range(repeat):
+        context = setup(parameter)
+        _clear_caches()
+        start = time.perf_counter()
+        function(context)
+        timings.append(time.perf_counter() - start)
+
+    context = setup(parameter)
+    _clear_caches()
+    tracemalloc.start()
+    function(context)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return {'best': min(timings), 'median': statistics.median(timings), 'peak_bytes': peak}
+
+
+def run_benchmarks(name_filter=None, repeat=7):
+    """
+    Exécute tous les cas (ou ceux dont le nom contient name_filter).
+
+    Returns:
+        dict: Les mesures, indexées par 'nom[paramètre]'
+    """
+    results = {}
+    for name, parameters, setup, function in CASES:
+        if name_filter and name_filter not in name:
+            continue
+        for parameter in parameters:
+            key = f"{name}[{parameter}]"
+            results[key] = measure_case(setup, function, parameter, repeat)
+            print(f"{key:45s} {results[key]['best'] * 1e3:10.3f} ms {results[key]['peak_bytes'] / 2**20:10.2f} Mio")
+    return results
+
+
+def compare(results, baseline, time_tolerance, memory_tolerance):
+    """
+    Compare des mesures à la référence.
+
+    Returns:
+        list: Les régressions, sous forme de messages
+    """
+    regressions = []
+    for key, measured in results.items():
+        reference = baseline.get(key)
+        if reference is None:
+            continue
+        # Les cas très courts sont dominés par le bruit : on tolère 50 µs d'écart absolu
+        if measured['best'] > reference['best'] * time_tolerance and measured['best'] - reference['best'] > 5e-5:
+            regressions.append(f"{key} : temps {reference['best'] * 1e3:.3f} ms -> {measured['best'] * 1e3:.3f} ms")
+        if measured['peak_bytes'] > reference['peak_bytes'] * memory_tolerance + 4096:
+            regressions.append(f"{key} : mémoire {reference['peak_bytes']} -> {measured['peak_bytes']} octets")
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Micro-benchmarks du simulateur de Shor.")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+    run_parser = subparsers.add_parser('run', help="Exécute les benchmarks")
+    run_parser.add_argument('--save', action='store_true', help="Enregistre les mesures comme référence")
+    compare_parser = subparsers.add_parser('compare', help="Compare à la référence enregistrée")
+    compare_parser.add_argument('--time-tolerance', type=float, default=2.0,
+                                help="Rapport de temps toléré (2.0 par défaut)")
+    compare_parser.add_argument('--memory-tolerance', type=float, default=1.2,
+                                help="Rapport de pic mémoire toléré (1.2 par défaut)")
+    for subparser in (run_parser, compare_parser):
+        subparser.add_argument('--filter', default=None, help="Ne garder que les cas contenant ce texte")
+        subparser.add_argument('--repeat', type=int, default=7, help="Nombre de répétitions par cas")
+    args = parser.parse_args(argv)
+
+    results = run_benchmarks(args.filter, args.repeat)
+
+    if args.command == 'run':
+        if args.save:
+            baseline = {
+                'environment': {'python': platform.python_version(), 'numpy': np.__version__,
+                                'machine': platform.machine()},
+                'results': results,
+            }
+            with open(BASELINE_PATH, 'w') as f:
+                json.dump(baseline, f, indent=2, sort_keys=True)
+            print(f"Référence enregistrée dans {BASELINE_PATH}")
+        return 0
+
+    with open(BASELINE_PATH) as f:
+        baseline = json.load(f)['results']
+    regressions = compare(results, baseline, args.time_tolerance, args.memory_tolerance)
+    for regression in regressions:
+        print(f"RÉGRESSION {regression}")
+    if not regressions:
+        print("Aucune régression par rapport à la référence")
+    return 1 if regressions else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,85 @@
+"""
+Benchmark de régression du temps de démarrage à froid.
+
+Importe les modules non graphiques (registre quantique, parties classiques,
+moteur ShorRunner) dans un interpréteur neuf avec ``python -X importtime``,
+et échoue (code de sortie 1) si :
+    - le temps d'import cumulé dépasse le budget ;
+    - une dépendance lourde (streamlit, plotly, pandas, sympy) est chargée.
+
+Usage :
+    python benchmarks/import_time.py [--budget-ms 600] [--repeat 5]
+"""
+import argparse
+import os
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+MODULES = (
+    'quantum.quantum_register',
+    'classical.continued_fraction',
+    'classical.preprocessing',
+    'classical.order',
+    'shor_runner',
+)
+
+# Dépendances qui ne doivent être chargées qu'à la première utilisation
+HEAVY_MODULES = ('streamlit', 'plotly', 'pandas', 'sympy')
+
+DEFAULT_BUDGET_MS = 600
+
+
+def measure_import_time(modules=MODULES):
+    """
+    Importe les modules dans un nouveau processus et retourne
+    (temps cumulé en ms, ensemble des paquets de premier niveau chargés).
+    """
+    statement = 'import ' + ', '.join(modules)
+    completed = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', statement],
+        cwd=ROOT, capture_output=True, text=True, check=True,
+    )
+    total_us = 0
+    loaded = set()
+    for line in completed.stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        _, cumulative, name = line[len('import time:'):].split('|')
+        loaded.add(name.strip().split('.')[0])
+        # Les imports de premier niveau ne sont pas indentés
+        if not name.startswith('  '):
+            total_us += int(cumulative)
+    return total_us / 1000, loaded
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Vérifie le budget de temps d'import à froid.")
+    parser.add_argument('--budget-ms', type=float, default=DEFAULT_BUDGET_MS,
+                        help=f"Budget en millisecondes ({DEFAULT_BUDGET_MS} par défaut)")
+    parser.add_argument('--repeat', type=int, default=5,
+                        help="Nombre de mesures ; la meilleure est retenue (5 par défaut)")
+    args = parser.parse_args(argv)
+
+    timings = []
+    loaded = set()
+    for _ in range(args.repeat):
+        elapsed_ms, loaded = measure_import_time()
+        timings.append(elapsed_ms)
+    best = min(timings)
+    heavy = sorted(set(HEAVY_MODULES) & loaded)
+
+    print(f"Temps d'import à froid : {best:.1f} ms (budget {args.budget_ms:.0f} ms)")
+    failed = False
+    if best > args.budget_ms:
+        print("ÉCHEC : le budget de démarrage est dépassé")
+        failed = True
+    if heavy:
+        print(f"ÉCHEC : dépendances lourdes chargées à l'import : {', '.join(heavy)}")
+        failed = True
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,36 @@
+"""
+Partie classique de l'algorithme de Shor (prétraitement, ordre, fractions continues).
+
+Les attributs du paquet sont chargés à la première utilisation : importer
+``classical`` ne charge pas sympy tant qu'on n'en a pas besoin.
+"""
+import importlib
+
+_LAZY_ATTRIBUTES = {
+    'ContinuedFraction': 'classical.continued_fraction',
+    'ContinuedFractionConvergents': 'classical.continued_fraction',
+    'iter_convergents': 'classical.continued_fraction',
+    'iter_rational_coefficients': 'classical.continued_fraction',
+    'DecodeIndex': 'classical.decode_index',
+    'get_decode_index': 'classical.decode_index',
+    'Preprocessor': 'classical.preprocessing',
+    'find_a': 'classical.preprocessing',
+    'BaseScheduler': 'classical.preprocessing',
+    'multiplicative_order': 'classical.order',
+    'carmichael': 'classical.order',
+    'Explanations': 'classical.explanations',
+}
+
+__all__ = sorted(_LAZY_ATTRIBUTES)
+
+
+def __getattr__(name):
+    if name not in _LAZY_ATTRIBUTES:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(_LAZY_ATTRIBUTES[name]), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
@@ -1,3 +1,38 @@
+def iter_rational_coefficients(numerator, denominator):
+    """
+    Génère les coefficients de la fraction continue de numerator/denominator
+    par l'algorithme d'Euclide sur les entiers : le résultat est exact quelle
+    que soit la taille des entiers, en O(log denominator) étapes.
+    """
+    if denominator <= 0:
+        raise ValueError(f"Le dénominateur doit être strictement positif (reçu {denominator})")
+    while denominator:
+        a, remainder = divmod(numerator, denominator)
+        yield a
+        numerator, denominator = denominator, remainder
+
+
+def iter_convergents(coefficients, max_denominator=None):
+    """
+    Génère paresseusement les convergents (h, k) d'une suite de coefficients.
+
+    Args:
+        coefficients: Un itérable de coefficients (éventuellement un générateur)
+        max_denominator: Si fourni, la génération s'arrête dès qu'un
+            dénominateur k >= max_denominator est atteint (il n'est pas produit)
+    """
+    h_minus_2, k_minus_2 = 0, 1
+    h_minus_1, k_minus_1 = 1, 0
+    for a in coefficients:
+        h_n = a * h_minus_1 + h_minus_2
+        k_n = a * k_minus_1 + k_minus_2
+        if max_denominator is not None and k_n >= max_denominator:
+            return
+        yield h_n, k_n
+        h_minus_2, k_minus_2 = h_minus_1, k_minus_1
+        h_minus_1, k_minus_1 = h_n, k_n
+
+
 class ContinuedFraction:
     def __init__(self, number, max_depth=100):
         """
@@ -12,6 +47,30 @@ class ContinuedFraction:
         self.coefficients = []
         self._compute_coefficients()
 
+    @classmethod
+    def from_rational(cls, numerator, denominator, max_depth=None):
+        """
+        Construit la fraction continue exacte de numerator/denominator.
+
+        Contrairement au constructeur, qui travaille sur un flottant (53 bits
+        de précision), le calcul se fait sur des entiers : il reste exact pour
+        une mesure s/Q avec Q = 2^n quel que soit n.
+
+        Args:
+            numerator: Le numérateur (par exemple la mesure s)
+            denominator: Le dénominateur (par exemple Q = 2^n)
+            max_depth: Le nombre maximum de coefficients (aucune limite par défaut)
+        """
+        cf = cls.__new__(cls)
+        cf.number = numerator / denominator
+        cf.max_depth = max_depth
+        cf.coefficients = []
+        for a in iter_rational_coefficients(numerator, denominator):
+            if max_depth is not None and len(cf.coefficients) >= max_depth:
+                break
+            cf.coefficients.append(a)
+        return cf
+
     def _compute_coefficients(self):
         """
         Calcule les coefficients de la fraction continue.
@@ -58,20 +117,7 @@ class ContinuedFractionConvergents:
         """
         Calcule les convergents de la fraction continue en utilisant la formule de récurrence standard.
         """
-        if not self.coefficients:
-            return
-
-        h_minus_2, k_minus_2 = 0, 1
-        h_minus_1, k_minus_1 = 1, 0
-
-        for a in self.coefficients:
-            h_n = a * h_minus_1 + h_minus_2
-            k_n = a * k_minus_1 + k_minus_2
-            
-            self.convergents.append((h_n, k_n))
-            
-            h_minus_2, k_minus_2 = h_minus_1, k_minus_1
-            h_minus_1, k_minus_1 = h_n, k_n
+        self.convergents = list(iter_convergents(self.coefficients))
 
     def get_convergents(self):
         """
@@ -0,0 +1,165 @@
+import threading
+from collections import OrderedDict
+
+import numpy as np
+
+from classical.order import multiplicative_order
+
+# Au-delà, la table (Q entrées) et son calcul deviennent trop coûteux
+DECODE_INDEX_MAX_QUBITS = 20
+DECODE_INDEX_CACHE_SIZE = 16
+
+_cache = OrderedDict()
+# Le cache est partagé par les threads (tentatives en arrière-plan de l'application)
+_cache_lock = threading.Lock()
+
+
+def decode_periods(measurements, Q, n, order):
+    """
+    Décode un tableau de mesures s d'un coup : pour chacune, le premier
+    convergent k < N de s/Q tel que a^k ≡ 1 mod N (k multiple de l'ordre),
+    ou 0 si le décodage échoue.
+
+    L'algorithme d'Euclide est déroulé sur toutes les mesures à la fois ;
+    seules les mesures encore en cours de décodage sont conservées d'une
+    itération à l'autre. Les calculs sont faits en int64 : Q·N doit rester
+    inférieur à 2^63.
+
+    Args:
+        measurements: Tableau 1D d'entiers dans [0, Q)
+        Q: La taille du registre de comptage
+        n: Le nombre à factoriser
+        order: L'ordre de a modulo N
+
+    Returns:
+        np.ndarray: Les périodes décodées (int64), 0 en cas d'échec
+    """
+    if Q * n >= 2**63:
+        raise ValueError(f"Décodage vectorisé limité à Q·N < 2^63 (Q={Q}, N={n})")
+    measurements = np.asarray(measurements, dtype=np.int64)
+    periods = np.zeros(measurements.size, dtype=np.int64)
+    positions = np.arange(measurements.size)
+    numerators = measurements.copy()
+    denominators = np.full(measurements.size, Q, dtype=np.int64)
+    # Dénominateurs des deux convergents précédents (k_{-1} = 0, k_{-2} = 1)
+    k_previous = np.zeros(measurements.size, dtype=np.int64)
+    k_before = np.ones(measurements.size, dtype=np.int64)
+    while positions.size:
+        quotients, remainders = np.divmod(numerators, denominators)
+        k = quotients * k_previous + k_before
+        too_large = k >= n
+        found = ~too_large & (k % order == 0)
+        periods[positions[found]] = k[found]
+        keep = ~too_large & ~found & (remainders != 0)
+        positions = positions[keep]
+        numerators, denominators = denominators[keep], remainders[keep]
+        k_before, k_previous = k_previous[keep], k[keep]
+    return periods
+
+
+class DecodeIndex:
+    def __init__(self, a, n, num_qubits):
+        """
+        Table de décodage mesure -> période pour une base a, un nombre N et
+        un registre de Q = 2^num_qubits états.
+
+        Pour chaque mesure s de [0, Q), periods[s] contient la période que
+        donne le décodage par fractions continues de s/Q (le premier convergent
+        k < N tel que a^k ≡ 1 mod N), ou 0 si le décodage échoue. La table est
+        calculée une fois, vectoriellement sur toutes les mesures ; décoder une
+        mesure devient une simple lecture.
+
+        Args:
+            a: La base
+            n: Le nombre à factoriser
+            num_qubits: La taille du registre de comptage
+        """
+        if num_qubits > DECODE_INDEX_MAX_QUBITS:
+            raise ValueError(f"Table de décodage limitée à {DECODE_INDEX_MAX_QUBITS} qubits (reçu {num_qubits})")
+        self.order = multiplicative_order(a, n)
+        if self.order is None:
+            raise ValueError(f"La base a={a} n'est pas première avec N={n}")
+        self.a = a
+        self.n = n
+        self.num_qubits = num_qubits
+        self.Q = 2**num_qubits
+        self.periods = self._build()
+
+    def _build(self):
+        periods = decode_periods(np.arange(self.Q, dtype=np.int64), self.Q, self.n, self.order)
+        return periods.astype(np.int32 if self.n < 2**31 else np.int64)
+
+    def period(self, measurement):
+        """
+        Retourne la période décodée à partir de la mesure, ou None.
+        """
+        period = int(self.periods[measurement])
+        return period or None
+
+    def probabilities(self, measurements):
+        """
+        Probabilités exactes des mesures données après l'IQFT, telles que les
+        tire le simulateur (apply_oracle puis ShorRunner.measure).
+
+        Le registre de travail s'effondre sur f(x0) avec une probabilité
+        proportionnelle au nombre de termes de la superposition restante
+        (Q // r + 1 si x0 < Q mod r, Q // r sinon). La mesure est ensuite
+        conditionnée à un résultat non nul dans l'état obtenu, comme
+        measure(nonzero=True) : chacune des deux distributions possibles est
+        renormalisée sans |0> avant d'être moyennée.
+        """
+        from quantum.analytic_state import PeriodicState
+        Q, r = self.Q, self.order
+        measurements = np.asarray(measurements)
+        long_offsets = Q % r
+        states = [(long_offsets * (Q // r + 1) / Q, PeriodicState(Q, 0, r)),
+                  ((r - long_offsets) * (Q // r) / Q, PeriodicState(Q, r - 1, r))]
+        probabilities = np.zeros(measurements.shape)
+        for weight, state in states:
+            nonzero_mass = 1.0 - float(state.fourier_probability(0))
+            # Un état concentré sur |0> (a ≡ 1 mod N) ne donne que la mesure 0
+            if weight and nonzero_mass > 1e-12:
+                probabilities += weight * state.fourier_probability(measurements) / nonzero_mass
+        probabilities[measurements == 0] = 0.0
+        return probabilities
+
+    def period_probability(self):
+        """
+        Probabilité qu'une exécution quantique donne la période par décodage.
+        """
+        return float(self.probabilities(np.flatnonzero(self.periods)).sum())
+
+    def success_probability(self):
+        """
+        Probabilité qu'une exécution quantique aboutisse à des facteurs non
+        triviaux : période décodée paire et a^(r/2) ≢ -1 (mod N).
+        """
+        useful = [period for period in np.unique(self.periods[self.periods != 0]).tolist()
+                  if period % 2 == 0 and pow(self.a, period // 2, self.n) != self.n - 1]
+        measurements = np.flatnonzero(np.isin(self.periods, useful))
+        return float(self.probabilities(measurements).sum())
+
+
+def get_decode_index(a, n, num_qubits, build=True):
+    """
+    Retourne la table de décodage de (a, N, Q). Les tables sont conservées
+    dans un cache LRU (les DECODE_INDEX_CACHE_SIZE dernières utilisées).
+
+    Args:
+        build: Si False, retourne None plutôt que de construire une table
+            absente du cache (sa construction coûte plus qu'un décodage isolé)
+    """
+    key = (a, n, num_qubits)
+    with _cache_lock:
+        index = _cache.get(key)
+        if index is not None:
+            _cache.move_to_end(key)
+            return index
+    if not build:
+        return None
+    index = DecodeIndex(a, n, num_qubits)
+    with _cache_lock:
+        _cache[key] = index
+        if len(_cache) > DECODE_INDEX_CACHE_SIZE:
+            _cache.popitem(last=False)
+    return index
@@ -0,0 +1,60 @@
+import math
+from functools import lru_cache
+
+
+@lru_cache(maxsize=256)
+def _factorize(n):
+    """
+    Factorisation de n, mise en cache (n, λ(n) et leurs facteurs reviennent souvent).
+    """
+    # Import différé : sympy coûte près d'une seconde au démarrage
+    from sympy import factorint
+    return tuple(sorted(factorint(n).items()))
+
+
+@lru_cache(maxsize=256)
+def carmichael(n):
+    """
+    Calcule la fonction de Carmichael λ(n) : le plus petit exposant m tel que
+    a^m ≡ 1 (mod n) pour tout a premier avec n.
+    """
+    if n < 1:
+        raise ValueError(f"La fonction de Carmichael n'est pas définie pour n={n}")
+    result = 1
+    for p, k in _factorize(n):
+        if p == 2 and k >= 3:
+            exponent = 2**(k - 2)
+        else:
+            exponent = p**(k - 1) * (p - 1)
+        result = result * exponent // math.gcd(result, exponent)
+    return result
+
+
+@lru_cache(maxsize=1024)
+def multiplicative_order(a, n):
+    """
+    Calcule l'ordre multiplicatif r de a modulo n (le plus petit r > 0 tel que
+    a^r ≡ 1 mod n), c'est-à-dire la période de f(x) = a^x mod n.
+
+    L'ordre divise λ(n) : on part de λ(n) et on retire ses facteurs premiers
+    un à un tant que a^(ordre/p) ≡ 1 (mod n). Cela coûte O(log² λ) exponentiations
+    modulaires au lieu des O(r) d'un parcours linéaire. Le résultat est mis en
+    cache par (a, n).
+
+    Args:
+        a: La base
+        n: Le module
+
+    Returns:
+        int: L'ordre de a modulo n, ou None si a et n ne sont pas premiers entre eux
+    """
+    if n == 1:
+        return 1
+    a %= n
+    if math.gcd(a, n) != 1:
+        return None
+    order = carmichael(n)
+    for p, _ in _factorize(order):
+        while order % p == 0 and pow(a, order // p, n) == 1:
+            order //= p
+    return order
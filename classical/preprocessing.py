@@ -1,25 +1,119 @@
 import math
 import random
-from sympy import isprime
+from functools import lru_cache
+
+# Les petits facteurs premiers sont cherchés par division jusqu'à cette borne
+SMALL_PRIME_LIMIT = 1000
+
+# Nombre maximal d'itérations de Pollard rho : au-delà, le facteur n'est plus « bon marché »
+POLLARD_RHO_MAX_ITERATIONS = 2**14
+
+
+@lru_cache(maxsize=8)
+def small_primes(limit=SMALL_PRIME_LIMIT):
+    """
+    Retourne les nombres premiers inférieurs ou égaux à limit (crible
+    d'Ératosthène, mis en cache).
+    """
+    sieve = bytearray([1]) * (limit + 1)
+    sieve[:2] = b'\x00\x00'
+    for p in range(2, math.isqrt(limit) + 1):
+        if sieve[p]:
+            sieve[p * p::p] = bytearray(len(range(p * p, limit + 1, p)))
+    return tuple(i for i, is_prime in enumerate(sieve) if is_prime)
+
+
+def integer_root(n, k):
+    """
+    Calcule la racine k-ième entière de n (partie entière, calcul exact sur
+    les entiers par la méthode de Newton).
+    """
+    if n < 0:
+        raise ValueError(f"La racine entière n'est pas définie pour n={n}")
+    if n < 2:
+        return n
+    # Point de départ supérieur à la racine : la suite décroît jusqu'à elle
+    x = 1 << ((n.bit_length() + k - 1) // k)
+    while True:
+        y = ((k - 1) * x + n // x**(k - 1)) // k
+        if y >= x:
+            return x
+        x = y
+
+
+def pollard_rho(n, max_iterations=POLLARD_RHO_MAX_ITERATIONS, seed=1):
+    """
+    Cherche un facteur non trivial de n (composé, impair) par la méthode rho
+    de Pollard, variante de Brent. Les pgcd sont groupés par paquets de 128
+    produits.
+
+    Returns:
+        int: Un facteur non trivial, ou None si aucun n'est trouvé en
+        max_iterations itérations
+    """
+    for c in range(seed, seed + 3):
+        y, r, q, g = 2, 1, 1, 1
+        x = ys = y
+        iterations = 0
+        while g == 1 and iterations < max_iterations:
+            x = y
+            for _ in range(r):
+                y = (y * y + c) % n
+            k = 0
+            while k < r and g == 1:
+                ys = y
+                for _ in range(min(128, r - k)):
+                    y = (y * y + c) % n
+                    q = q * abs(x - y) % n
+                g = math.gcd(q, n)
+                k += 128
+            iterations += r
+            r *= 2
+        if g == n:
+            # Le paquet a tout absorbé : on reprend pas à pas depuis ys
+            g = 1
+            while g == 1:
+                ys = (ys * ys + c) % n
+                g = math.gcd(abs(x - ys), n)
+        if 1 < g < n:
+            return g
+    return None
+
 
 class Preprocessor:
-    def __init__(self, n):
+    def __init__(self, n, factor_shortcuts=False):
         """
         Initialise le préprocesseur avec le nombre à factoriser.
+
+        Args:
+            n: Le nombre à factoriser
+            factor_shortcuts: Si True, cherche aussi des facteurs bon marché
+                (division par les petits premiers, Pollard rho borné) pour que
+                l'étape quantique ne soit lancée que si elle est nécessaire.
+                Désactivé par défaut : le simulateur sert à montrer l'étape
+                quantique, y compris sur de petits N.
         """
         self.n = n
+        self.factor_shortcuts = factor_shortcuts
         self.is_valid = True
+        self.factors = None
         self.validation_steps = []
         
     def validate_number(self):
         """
-        Effectue toutes les validations de prétraitement.
-        Retourne True si le nombre est valide pour l'algorithme de Shor.
+        Effectue les validations de prétraitement, en s'arrêtant à la première
+        qui échoue. Retourne True si le nombre est valide pour l'algorithme de Shor ;
+        sinon, les facteurs éventuellement trouvés sont dans self.factors.
         """
-        self._check_triviality()
-        self._check_parity()
-        self._check_primality()
-        self._check_perfect_power()
+        checks = [self._check_triviality, self._check_parity]
+        if self.factor_shortcuts:
+            checks.append(self._check_small_factors)
+        checks += [self._check_primality, self._check_perfect_power]
+        if self.factor_shortcuts:
+            checks.append(self._check_pollard_rho)
+        for check in checks:
+            if not check():
+                break
         return self.is_valid
         
     def _check_triviality(self):
@@ -38,14 +132,31 @@ class Preprocessor:
         """
         if self.n % 2 == 0 and self.n != 2:
             self.is_valid = False
+            self.factors = (2, self.n // 2)
             self.validation_steps.append(f"Le nombre {self.n} est pair et différent de 2")
             return False
         return True
+
+    def _check_small_factors(self):
+        """
+        Cherche un petit facteur premier par division.
+        """
+        for p in small_primes():
+            if p * p > self.n:
+                break
+            if self.n % p == 0:
+                self.is_valid = False
+                self.factors = (p, self.n // p)
+                self.validation_steps.append(f"Le nombre {self.n} est divisible par le petit nombre premier {p}")
+                return False
+        return True
         
     def _check_primality(self):
         """
         Vérifie si le nombre est premier.
         """
+        # Import différé : sympy coûte près d'une seconde au démarrage
+        from sympy import isprime
         if isprime(self.n):
             self.is_valid = False
             self.validation_steps.append(f"Le nombre {self.n} est premier")
@@ -55,14 +166,32 @@ class Preprocessor:
     def _check_perfect_power(self):
         """
         Vérifie si le nombre est une puissance parfaite (a^b).
+
+        Il suffit d'essayer les exposants b premiers : a^(pq) = (a^q)^p. Les
+        racines sont calculées exactement sur les entiers.
         """
-        for b in range(2, int(math.log2(self.n)) + 1):
-            a = round(self.n ** (1/b))
+        for b in small_primes(max(2, self.n.bit_length())):
+            if 2**b > self.n:
+                break
+            a = integer_root(self.n, b)
             if a ** b == self.n:
                 self.is_valid = False
+                self.factors = (a, self.n // a)
                 self.validation_steps.append(f"Le nombre {self.n} est une puissance parfaite ({a}^{b})")
                 return False
         return True
+
+    def _check_pollard_rho(self):
+        """
+        Cherche un facteur bon marché par Pollard rho (nombre d'itérations borné).
+        """
+        factor = pollard_rho(self.n)
+        if factor is not None:
+            self.is_valid = False
+            self.factors = (factor, self.n // factor)
+            self.validation_steps.append(f"Le facteur {factor} de {self.n} a été trouvé par Pollard rho")
+            return False
+        return True
         
     def get_validation_steps(self):
         """
@@ -80,16 +209,102 @@ class Preprocessor:
             return gcd
         return None
 
+BASE_RANKINGS = (None, 'parity', 'success')
+
+
+class BaseScheduler:
+    def __init__(self, n, exclude=None, ranking=None, rng=None, max_rejections=64):
+        """
+        Choisit les bases 'a' successives d'une factorisation, sans jamais
+        proposer deux fois la même.
+
+        Les bases sont tirées au hasard dans [2, N) et rejetées si elles ne
+        sont pas premières avec N ou déjà essayées (ensemble des bases
+        proposées) : le coût moyen d'un tirage est O(1), quelle que soit la
+        taille de N. Ce n'est que si max_rejections tirages de suite échouent
+        (presque toutes les bases déjà essayées) que les candidates restantes
+        sont énumérées.
+
+        Args:
+            n: Le nombre à factoriser
+            exclude: Des bases à ne pas proposer
+            ranking: None (tirage uniforme), 'parity' (privilégier les bases
+                d'ordre pair) ou 'success' (ordre pair et a^(r/2) ≢ -1 mod N,
+                c'est-à-dire les bases qui mènent aux facteurs). Le classement
+                calcule l'ordre de chaque candidate.
+            rng: Le générateur aléatoire (module random par défaut)
+            max_rejections: Le nombre de tirages rejetés avant l'énumération
+        """
+        if ranking not in BASE_RANKINGS:
+            raise ValueError(f"Classement inconnu '{ranking}', choisir parmi {BASE_RANKINGS}")
+        self.n = n
+        self.tried = set(exclude or ())
+        self.ranking = ranking
+        self.rng = rng or random
+        self.max_rejections = max_rejections
+
+    def _is_promising(self, a):
+        """
+        Indique si la base satisfait le critère de classement.
+        """
+        if self.ranking is None:
+            return True
+        from classical.order import multiplicative_order
+        r = multiplicative_order(a, self.n)
+        if r % 2 != 0:
+            return False
+        return self.ranking == 'parity' or pow(a, r // 2, self.n) != self.n - 1
+
+    def next_base(self):
+        """
+        Retourne une nouvelle base, marquée comme essayée.
+
+        Raises:
+            ValueError: S'il ne reste aucune base valide
+        """
+        fallback = None
+        if self.n > 3:
+            for _ in range(self.max_rejections):
+                a = self.rng.randrange(2, self.n)
+                if a in self.tried or math.gcd(a, self.n) != 1:
+                    continue
+                if self._is_promising(a):
+                    return self._take(a)
+                if fallback is None:
+                    fallback = a
+        if fallback is not None:
+            return self._take(fallback)
+
+        remaining = [i for i in range(2, self.n) if math.gcd(i, self.n) == 1 and i not in self.tried]
+        if not remaining:
+            raise ValueError(f"Impossible de trouver une base 'a' valide pour N={self.n} "
+                             f"qui n'a pas déjà été essayée ({len(self.tried)} bases exclues)")
+        promising = [a for a in remaining if self._is_promising(a)]
+        return self._take(self.rng.choice(promising or remaining))
+
+    def _take(self, a):
+        self.tried.add(a)
+        return a
+
+    def mark_tried(self, a):
+        """
+        Exclut une base des tirages suivants.
+        """
+        self.tried.add(a)
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        try:
+            return self.next_base()
+        except ValueError:
+            raise StopIteration
+
+
 def find_a(n, exclude=None):
     """
     Trouve une base 'a' appropriée pour l'algorithme de Shor.
     'a' doit être > 1 et premier avec n.
     """
-    if exclude is None:
-        exclude = []
-    
-    possible_bases = [i for i in range(2, n) if math.gcd(i, n) == 1 and i not in exclude]
-    if not possible_bases:
-        raise ValueError(f"Impossible de trouver une base 'a' valide pour N={n} qui n'est pas dans {exclude}")
-        
-    return random.choice(possible_bases)
+    return BaseScheduler(n, exclude=exclude).next_base()
@@ -0,0 +1,11 @@
+"""
+Instrumentation des étapes de la simulation (voir instrumentation/spans.py).
+
+Paquet indépendant de l'application : le paquet quantum, ShorRunner et
+l'interface l'importent sans dépendre les uns des autres.
+"""
+from instrumentation.spans import (Span, SpanRecorder, instrumented, register_control_flow_exception,
+                                   register_hook, span, unregister_hook)
+
+__all__ = ['Span', 'SpanRecorder', 'instrumented', 'register_control_flow_exception',
+           'register_hook', 'span', 'unregister_hook']
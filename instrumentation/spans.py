@@ -0,0 +1,266 @@
+"""
+Instrumentation des étapes de la simulation (durée, mémoire, taille de l'état).
+
+Les opérations du registre quantique, les étapes de ShorRunner et celles de
+l'application sont enveloppées dans des « spans ». Tant qu'aucun hook n'est
+enregistré, un span se réduit à un test sur une liste vide : le coût est
+négligeable. Exemple :
+
+    recorder = SpanRecorder()
+    register_hook(recorder, trace_memory=True)
+    ShorRunner(91).run()
+    print(recorder.to_prometheus())
+"""
+import functools
+import json
+import threading
+import time
+import tracemalloc
+
+_hooks = []
+_memory_hooks = []
+_local = threading.local()
+# Exceptions de contrôle de flux (par exemple st.rerun() dans l'application) :
+# elles traversent les spans sans les marquer en erreur
+_control_flow_exceptions = ()
+
+
+class Span:
+    def __init__(self, name, attributes=None):
+        """
+        Mesure d'une étape : nom, durée, mémoire allouée et attributs libres
+        (par exemple la taille du vecteur d'état).
+        """
+        self.name = name
+        self.attributes = dict(attributes or {})
+        self.parent = None
+        self.start_time = None
+        self.duration = None
+        self.allocated_bytes = None
+        self.peak_bytes = None
+        self.error = None
+        self._start_memory = None
+        self._children_peak = 0
+
+    def set_attribute(self, key, value):
+        self.attributes[key] = value
+
+    def to_dict(self):
+        return {
+            'name': self.name,
+            'parent': self.parent.name if self.parent else None,
+            'start_time': self.start_time,
+            'duration': self.duration,
+            'allocated_bytes': self.allocated_bytes,
+            'peak_bytes': self.peak_bytes,
+            'error': self.error,
+            'attributes': self.attributes,
+        }
+
+
+class _NoopSpan:
+    """Span utilisé quand aucun hook n'est enregistré : ne mesure rien."""
+
+    def set_attribute(self, key, value):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
+
+
+_NOOP_SPAN = _NoopSpan()
+
+
+class _ActiveSpan:
+    def __init__(self, span):
+        self.span = span
+
+    def __enter__(self):
+        span = self.span
+        stack = _span_stack()
+        span.parent = stack[-1] if stack else None
+        stack.append(span)
+        if _memory_hooks and tracemalloc.is_tracing():
+            span._start_memory = tracemalloc.get_traced_memory()[0]
+            # Le pic est remis à zéro pour ce span ; celui du parent est
+            # reconstitué à la fin à partir des pics de ses enfants.
+            if span.parent is not None and span.parent._start_memory is not None:
+                span.parent._children_peak = max(span.parent._children_peak, tracemalloc.get_traced_memory()[1])
+            tracemalloc.reset_peak()
+        span.start_time = time.time()
+        self._start = time.perf_counter()
+        return span
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        span = self.span
+        span.duration = time.perf_counter() - self._start
+        if exc_type is not None and not issubclass(exc_type, _control_flow_exceptions):
+            span.error = exc_type.__name__
+        if span._start_memory is not None and tracemalloc.is_tracing():
+            current, peak = tracemalloc.get_traced_memory()
+            absolute_peak = max(peak, span._children_peak)
+            span.allocated_bytes = current - span._start_memory
+            span.peak_bytes = absolute_peak - span._start_memory
+            if span.parent is not None:
+                span.parent._children_peak = max(span.parent._children_peak, absolute_peak)
+        _span_stack().pop()
+        for hook in list(_hooks):
+            hook(span)
+        return False
+
+
+def _span_stack():
+    stack = getattr(_local, 'stack', None)
+    if stack is None:
+        stack = _local.stack = []
+    return stack
+
+
+def register_hook(hook, trace_memory=False):
+    """
+    Enregistre un hook appelé avec chaque Span terminé.
+
+    Args:
+        hook: Un appelable hook(span)
+        trace_memory: Si True, active tracemalloc pour renseigner la mémoire
+            allouée par chaque span (coûteux : à réserver au diagnostic)
+    """
+    _hooks.append(hook)
+    if trace_memory:
+        _memory_hooks.append(hook)
+        if not tracemalloc.is_tracing():
+            tracemalloc.start()
+
+
+def unregister_hook(hook):
+    """
+    Retire un hook ; tracemalloc est arrêté quand plus aucun hook ne l'utilise.
+    """
+    _hooks.remove(hook)
+    if hook in _memory_hooks:
+        _memory_hooks.remove(hook)
+        if not _memory_hooks and tracemalloc.is_tracing():
+            tracemalloc.stop()
+
+
+def register_control_flow_exception(*exception_types):
+    """
+    Déclare des exceptions de contrôle de flux : un span qu'elles
+    interrompent n'est pas compté comme une erreur (span_errors_total).
+    """
+    global _control_flow_exceptions
+    _control_flow_exceptions = tuple(set(_control_flow_exceptions) | set(exception_types))
+
+
+def span(name, **attributes):
+    """
+    Contexte mesurant un bloc de code. Sans hook enregistré, retourne un span
+    inerte partagé.
+    """
+    if not _hooks:
+        return _NOOP_SPAN
+    return _ActiveSpan(Span(name, attributes))
+
+
+def instrumented(name, attributes=None):
+    """
+    Décorateur enveloppant une fonction dans un span.
+
+    Args:
+        name: Le nom du span
+        attributes: Fonction optionnelle appelée avec les arguments de la
+            fonction décorée, après son exécution, et retournant un dict
+            d'attributs (par exemple la taille de l'état du registre). Une
+            exception levée par cette fonction n'est pas propagée (elle
+            masquerait celle de la fonction décorée) : son type est noté
+            dans l'attribut 'attributes_error'
+    """
+    def decorator(function):
+        @functools.wraps(function)
+        def wrapper(*args, **kwargs):
+            if not _hooks:
+                return function(*args, **kwargs)
+            with _ActiveSpan(Span(name)) as current:
+                try:
+                    return function(*args, **kwargs)
+                finally:
+                    if attributes is not None:
+                        try:
+                            current.attributes.update(attributes(*args, **kwargs))
+                        except Exception as e:
+                            current.attributes['attributes_error'] = type(e).__name__
+        return wrapper
+    return decorator
+
+
+class SpanRecorder:
+    def __init__(self, max_spans=10000):
+        """
+        Hook qui conserve les spans terminés (au plus max_spans, les plus
+        anciens sont oubliés) et les exporte en JSON ou au format texte de Prometheus.
+        """
+        self.max_spans = max_spans
+        self.spans = []
+        self._lock = threading.Lock()
+
+    def __call__(self, span):
+        with self._lock:
+            self.spans.append(span)
+            if len(self.spans) > self.max_spans:
+                del self.spans[:len(self.spans) - self.max_spans]
+
+    def clear(self):
+        with self._lock:
+            self.spans = []
+
+    def to_json(self):
+        with self._lock:
+            return json.dumps([span.to_dict() for span in self.spans], default=str)
+
+    def to_prometheus(self, prefix='shor'):
+        """
+        Agrège les spans par nom : durée totale et nombre d'appels (summary),
+        mémoire allouée totale et dernière taille d'état observée.
+        """
+        totals = {}
+        with self._lock:
+            for span in self.spans:
+                entry = totals.setdefault(span.name, {'count': 0, 'duration': 0.0, 'allocated': 0,
+                                                      'errors': 0, 'state_bytes': None})
+                entry['count'] += 1
+                entry['duration'] += span.duration
+                entry['allocated'] += span.allocated_bytes or 0
+                entry['errors'] += span.error is not None
+                if 'state_bytes' in span.attributes:
+                    entry['state_bytes'] = span.attributes['state_bytes']
+
+        lines = [
+            f"# HELP {prefix}_span_duration_seconds Durée des étapes de la simulation",
+            f"# TYPE {prefix}_span_duration_seconds summary",
+        ]
+        for name, entry in sorted(totals.items()):
+            lines.append(f'{prefix}_span_duration_seconds_sum{{span="{name}"}} {entry["duration"]:.9f}')
+            lines.append(f'{prefix}_span_duration_seconds_count{{span="{name}"}} {entry["count"]}')
+        lines += [
+            f"# HELP {prefix}_span_allocated_bytes_total Mémoire allouée (tracemalloc) par les étapes",
+            f"# TYPE {prefix}_span_allocated_bytes_total counter",
+        ]
+        for name, entry in sorted(totals.items()):
+            lines.append(f'{prefix}_span_allocated_bytes_total{{span="{name}"}} {entry["allocated"]}')
+        lines += [
+            f"# HELP {prefix}_span_errors_total Étapes interrompues par une exception",
+            f"# TYPE {prefix}_span_errors_total counter",
+        ]
+        for name, entry in sorted(totals.items()):
+            lines.append(f'{prefix}_span_errors_total{{span="{name}"}} {entry["errors"]}')
+        lines += [
+            f"# HELP {prefix}_state_bytes Taille du vecteur d'état après l'étape",
+            f"# TYPE {prefix}_state_bytes gauge",
+        ]
+        for name, entry in sorted(totals.items()):
+            if entry['state_bytes'] is not None:
+                lines.append(f'{prefix}_state_bytes{{span="{name}"}} {entry["state_bytes"]}')
+        return '\n'.join(lines) + '\n'
@@ -0,0 +1,256 @@
+"""
+Estimation Monte-Carlo du taux de succès de l'étape quantique de Shor.
+
+Pour un triplet (N, a, nombre de qubits), on simule K exécutions à la fois :
+le décalage x0 du registre de travail et la mesure après IQFT sont tirés sous
+forme de tableaux, toutes les mesures sont décodées par un seul passage
+vectorisé de fractions continues (decode_periods), et les vérifications de
+calculate_factors sont appliquées une fois par période distincte. Chaque essai
+correspond à une exécution de l'application : une mesure non nulle, décodée
+seule.
+
+Usage :
+    python monte_carlo.py 91 --bases 2 5 --trials 1000000 [--seed 0] [--json]
+"""
+import argparse
+import json
+import math
+import statistics
+import time
+
+import numpy as np
+
+from classical.decode_index import DECODE_INDEX_MAX_QUBITS, decode_periods, get_decode_index
+from classical.order import multiplicative_order
+from quantum.analytic_state import PeriodicState
+from shor_runner import ShorRunner
+
+# Nombre d'essais simulés à la fois (borne la mémoire, quelques Mio par lot)
+DEFAULT_BATCH_SIZE = 2**18
+
+# Jusqu'à cette taille, les mesures sont tirées dans la distribution exacte
+# tabulée (table de décodage) ; au-delà, par rejet sur le noyau de Fejér.
+EXACT_SAMPLING_MAX_QUBITS = DECODE_INDEX_MAX_QUBITS
+
+
+def wilson_interval(successes, trials, confidence=0.95):
+    """
+    Intervalle de confiance de Wilson pour une proportion : contrairement à
+    l'intervalle normal, il reste dans [0, 1] et garde du sens pour un taux
+    proche de 0 ou de 1.
+
+    Returns:
+        tuple: (borne basse, borne haute)
+    """
+    if trials == 0:
+        return 0.0, 1.0
+    z = statistics.NormalDist().inv_cdf(0.5 + confidence / 2)
+    rate = successes / trials
+    denominator = 1 + z * z / trials
+    center = (rate + z * z / (2 * trials)) / denominator
+    half_width = z * math.sqrt(rate * (1 - rate) / trials + z * z / (4 * trials * trials)) / denominator
+    return max(0.0, center - half_width), min(1.0, center + half_width)
+
+
+class SuccessEstimate:
+    def __init__(self, n, a, num_qubits, confidence=0.95):
+        """
+        Résultat (cumulé lot par lot) d'une estimation Monte-Carlo.
+
+        trials_to_success[k] compte les succès obtenus après exactement k
+        essais depuis le succès précédent : c'est la distribution empirique du
+        nombre d'exécutions quantiques nécessaires avec cette base.
+        """
+        self.n = n
+        self.a = a
+        self.num_qubits = num_qubits
+        self.confidence = confidence
+        self.trials = 0
+        self.successes = 0
+        self.periods_found = 0
+        self.trials_to_success = np.zeros(1, dtype=np.int64)
+        self.duration = 0.0
+        # Essais écoulés depuis le dernier succès (reportés d'un lot à l'autre)
+        self._pending = 0
+
+    def add_batch(self, period_found, success):
+        """
+        Ajoute un lot d'essais (tableaux booléens, dans l'ordre des essais).
+        """
+        self.trials += success.size
+        self.successes += int(np.count_nonzero(success))
+        self.periods_found += int(np.count_nonzero(period_found))
+        positions = np.flatnonzero(success)
+        if positions.size == 0:
+            self._pending += success.size
+            return
+        gaps = np.diff(positions, prepend=-1)
+        gaps[0] += self._pending
+        self._pending = success.size - 1 - int(positions[-1])
+        counts = np.bincount(gaps)
+        if counts.size > self.trials_to_success.size:
+            counts[:self.trials_to_success.size] += self.trials_to_success
+            self.trials_to_success = counts
+        else:
+            self.trials_to_success[:counts.size] += counts
+
+    @property
+    def rate(self):
+        return self.successes / self.trials if self.trials else 0.0
+
+    @property
+    def interval(self):
+        return wilson_interval(self.successes, self.trials, self.confidence)
+
+    @property
+    def period_rate(self):
+        """Proportion des essais dont la mesure donne la période (facteurs triviaux compris)."""
+        return self.periods_found / self.trials if self.trials else 0.0
+
+    def trials_to_success_quantile(self, q):
+        """
+        Nombre d'essais suffisant dans une proportion q des cas observés, ou None.
+        """
+        total = int(self.trials_to_success.sum())
+        if total == 0:
+            return None
+        return int(np.searchsorted(np.cumsum(self.trials_to_success), q * total))
+
+    def to_dict(self):
+        low, high = self.interval
+        counts = {int(k): int(count) for k, count in enumerate(self.trials_to_success) if count}
+        return {
+            'n': self.n, 'a': self.a, 'num_qubits': self.num_qubits,
+            'trials': self.trials, 'successes': self.successes,
+            'rate': self.rate, 'confidence': self.confidence, 'interval': [low, high],
+            'period_rate': self.period_rate,
+            'trials_to_success': {
+                'mean': 1 / self.rate if self.successes else None,
+                'median': self.trials_to_success_quantile(0.5),
+                'p90': self.trials_to_success_quantile(0.9),
+                'p99': self.trials_to_success_quantile(0.99),
+                'counts': counts,
+            },
+            'duration': self.duration,
+        }
+
+    def __str__(self):
+        low, high = self.interval
+        return (f"N={self.n}, a={self.a}, {self.num_qubits} qubits : succès {self.rate:.4%} "
+                f"[{low:.4%}, {high:.4%}] sur {self.trials} essais, "
+                f"médiane {self.trials_to_success_quantile(0.5)} essais par succès ({self.duration:.2f} s)")
+
+
+class MeasurementSampler:
+    def __init__(self, n, a, num_qubits):
+        """
+        Tire des mesures non nulles après IQFT, comme ShorRunner.measure.
+
+        Le registre de travail s'effondre sur f(x0) avec une probabilité
+        proportionnelle au nombre de termes de la superposition : x0 < Q mod r
+        donne Q // r + 1 termes, les autres Q // r. Seuls ces deux cas
+        changent la distribution après IQFT ; on tire donc d'abord le cas,
+        puis la mesure dans la distribution correspondante.
+        """
+        self.order = multiplicative_order(a, n)
+        if self.order is None:
+            raise ValueError(f"La base a={a} n'est pas première avec N={n}")
+        if self.order == 1:
+            raise ValueError(f"La base a={a} vaut 1 modulo N={n} : aucune mesure non nulle possible")
+        self.Q = 2**num_qubits
+        r = self.order
+        self._cdf = None
+        if num_qubits <= EXACT_SAMPLING_MAX_QUBITS:
+            # La table de décodage connaît déjà la distribution exacte (conditionnée sur s != 0)
+            index = get_decode_index(a, n, num_qubits)
+            self._cdf = np.cumsum(index.probabilities(np.arange(self.Q)))
+            return
+        self._long_weight = (self.Q % r) * (self.Q // r + 1) / self.Q
+        self._states = (PeriodicState(self.Q, 0, r), PeriodicState(self.Q, r - 1, r))
+
+    def sample(self, shots, rng):
+        if self._cdf is not None:
+            results = np.searchsorted(self._cdf, rng.random(shots) * self._cdf[-1], side='right')
+            return np.minimum(results, self.Q - 1)
+        results = np.zeros(shots, dtype=np.int64)
+        pending = np.arange(shots)
+        # Rejet vectorisé des zéros, borné comme dans QuantumRegister._sample_analytic
+        for _ in range(100):
+            if pending.size == 0:
+                break
+            long = rng.random(pending.size) < self._long_weight
+            for state, selected in ((self._states[0], long), (self._states[1], ~long)):
+                if np.any(selected):
+                    results[pending[selected]] = state.sample_fourier(int(np.count_nonzero(selected)), rng)
+            pending = pending[results[pending] == 0]
+        return results
+
+
+def _useful_periods(runner, a, periods):
+    """
+    Périodes (parmi celles décodées) pour lesquelles calculate_factors donne
+    des facteurs non triviaux. Les périodes distinctes sont peu nombreuses
+    (multiples de l'ordre inférieurs à N) : on les vérifie une à une.
+    """
+    useful = []
+    for period in np.unique(periods[periods != 0]).tolist():
+        factor1, factor2 = runner.calculate_factors(a, period)
+        if factor1 and factor2 and factor1 * factor2 == runner.n:
+            useful.append(period)
+    return np.array(useful, dtype=np.int64)
+
+
+def estimate_success_rate(n, a, num_qubits=None, trials=100000, confidence=0.95, seed=None,
+                          batch_size=DEFAULT_BATCH_SIZE):
+    """
+    Estime par Monte-Carlo la probabilité qu'une exécution quantique avec la
+    base a donne des facteurs non triviaux de N.
+
+    Args:
+        n: Le nombre à factoriser
+        a: La base (première avec N)
+        num_qubits: La taille du registre de comptage (celle de ShorRunner par défaut)
+        trials: Le nombre d'essais
+        confidence: Le niveau de l'intervalle de confiance
+        seed: La graine du générateur
+        batch_size: Le nombre d'essais simulés à la fois
+
+    Returns:
+        SuccessEstimate: Taux de succès, intervalle, distribution des essais par succès
+    """
+    runner = ShorRunner(n)
+    if num_qubits is None:
+        num_qubits = runner.num_qubits
+    start = time.perf_counter()
+    rng = np.random.default_rng(seed)
+    sampler = MeasurementSampler(n, a, num_qubits)
+    estimate = SuccessEstimate(n, a, num_qubits, confidence)
+    for batch_start in range(0, trials, batch_size):
+        measurements = sampler.sample(min(batch_size, trials - batch_start), rng)
+        periods = decode_periods(measurements, sampler.Q, n, sampler.order)
+        success = np.isin(periods, _useful_periods(runner, a, periods))
+        estimate.add_batch(periods != 0, success)
+    estimate.duration = time.perf_counter() - start
+    return estimate
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Estime par Monte-Carlo le taux de succès de l'étape quantique pour N et des bases données.")
+    parser.add_argument('n', type=int, help="Le nombre à factoriser")
+    parser.add_argument('--bases', type=int, nargs='+', required=True, help="Les bases à évaluer")
+    parser.add_argument('--num-qubits', type=int, default=None,
+                        help="Taille du registre de comptage (celle du simulateur par défaut)")
+    parser.add_argument('--trials', type=int, default=100000, help="Nombre d'essais par base")
+    parser.add_argument('--confidence', type=float, default=0.95, help="Niveau de confiance (0.95 par défaut)")
+    parser.add_argument('--seed', type=int, default=None, help="Graine du générateur")
+    parser.add_argument('--json', action='store_true', help="Écrit un résultat JSON par ligne")
+    args = parser.parse_args(argv)
+
+    for a in args.bases:
+        estimate = estimate_success_rate(args.n, a, args.num_qubits, args.trials, args.confidence, args.seed)
+        print(json.dumps(estimate.to_dict()) if args.json else estimate)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,29 @@
+"""
+Simulation quantique de l'algorithme de Shor.
+
+Les attributs du paquet sont chargés à la première utilisation : importer
+``quantum`` ne charge ni numpy ni plotly tant qu'on n'en a pas besoin.
+"""
+import importlib
+
+_LAZY_ATTRIBUTES = {
+    'QuantumRegister': 'quantum.quantum_register',
+    'check_single_precision': 'quantum.quantum_register',
+    'PeriodicState': 'quantum.analytic_state',
+    'SparseState': 'quantum.sparse_state',
+    'CircuitVisualizer': 'quantum.circuit_visualizer_clean',
+}
+
+__all__ = sorted(_LAZY_ATTRIBUTES)
+
+
+def __getattr__(name):
+    if name not in _LAZY_ATTRIBUTES:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(_LAZY_ATTRIBUTES[name]), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
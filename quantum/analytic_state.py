@@ -0,0 +1,192 @@
+import math
+
+import numpy as np
+
+# Au-delà, les produits de résidus modulo L <= Q ne tiennent plus sur 64 bits
+INT64_EXACT_MAX_Q = 2**31
+
+
+class PeriodicState:
+    def __init__(self, Q, x0, r):
+        """
+        Représentation symbolique de l'état périodique obtenu après l'oracle :
+        une superposition uniforme des |x0 + j*r> pour 0 <= x0 + j*r < Q.
+
+        Après l'IQFT, la distribution de mesure ne dépend que de (Q, r, count) :
+        P(k) = |Σ_j e^{2πi j k r / Q}|² / (count * Q), un noyau de Fejér.
+        On peut donc l'évaluer et l'échantillonner sans jamais allouer les Q
+        amplitudes.
+
+        Args:
+            Q: La taille de l'espace (2^num_qubits)
+            x0: Le décalage de la superposition (0 <= x0 < r)
+            r: La période de la superposition
+        """
+        if not (0 <= x0 < Q):
+            raise ValueError(f"Le décalage x0={x0} doit être dans [0, {Q})")
+        if r < 1:
+            raise ValueError(f"La période r={r} doit être strictement positive")
+        self.Q = Q
+        self.x0 = x0
+        self.r = r
+        self.count = (Q - x0 + r - 1) // r
+
+        # Le facteur r*k mod Q ne prend que les multiples de g = pgcd(r, Q) :
+        # on travaille sur le cercle réduit de taille L = Q / g.
+        self._g = math.gcd(r, Q)
+        self._L = Q // self._g
+        self._r_inverse = pow(r // self._g, -1, self._L) if self._L > 1 else 0
+        # Les résidus sont calculés en entiers exacts : en int64 tant que les
+        # produits (< L·Q) ne débordent pas, en entiers Python (object) au-delà.
+        self._int_dtype = np.int64 if Q <= INT64_EXACT_MAX_Q else object
+
+    def to_dense(self, dtype=np.complex128):
+        """
+        Matérialise le vecteur d'état périodique (avant IQFT).
+        """
+        state = np.zeros(self.Q, dtype=dtype)
+        state[self.x0::self.r] = 1.0 / np.sqrt(self.count)
+        return state
+
+    def support(self):
+        """
+        Retourne les indices non nuls de l'état périodique (avant IQFT).
+        """
+        return np.arange(self.x0, self.Q, self.r)
+
+    def _fejer(self, u):
+        """
+        Évalue sin²(π m u / L) / sin²(π u / L) pour des entiers u centrés dans
+        [-L/2, L/2), avec la valeur limite m² en u = 0.
+        """
+        m, L = self.count, self._L
+        u = np.asarray(u, dtype=self._int_dtype)
+        # (m*u) mod L calculé en entiers exacts pour ne pas perdre de bits
+        numerator_phase = np.asarray(((m % L) * u) % L, dtype=np.float64) / L
+        denominator_phase = np.asarray(u, dtype=np.float64) / L
+        numerator = np.sin(np.pi * numerator_phase) ** 2
+        denominator = np.sin(np.pi * denominator_phase) ** 2
+        values = np.full(numerator.shape, float(m) ** 2)
+        nonzero = denominator_phase != 0
+        values[nonzero] = numerator[nonzero] / denominator[nonzero]
+        return values
+
+    def _centered_residue(self, k):
+        """
+        Retourne u = (r/g)*k mod L, ramené dans [-L/2, L/2).
+        """
+        L = self._L
+        u = ((self.r // self._g) * np.asarray(k, dtype=self._int_dtype)) % L
+        return np.where(u >= L - L // 2, u - L, u)
+
+    def fourier_probability(self, k):
+        """
+        Probabilité (après IQFT) de mesurer chacun des entiers k.
+
+        Args:
+            k: Un entier ou un tableau d'entiers dans [0, Q)
+
+        Returns:
+            np.ndarray: Les probabilités correspondantes
+        """
+        u = self._centered_residue(k)
+        return self._fejer(u) / (self.count * self.Q)
+
+    def fourier_probabilities(self):
+        """
+        Retourne la distribution complète après IQFT (tableau de taille Q).
+        À réserver aux petits registres.
+        """
+        k = np.arange(self.Q)
+        u = (self.r // self._g) * k % self._L
+        u = np.where(u >= self._L - self._L // 2, u - self._L, u)
+        return self._fejer(u) / (self.count * self.Q)
+
+    def _envelope_mass(self, t):
+        """
+        Intégrale de 0 à t >= 0 de l'enveloppe min(m², L²/(4x²)).
+        """
+        m, L = float(self.count), float(self._L)
+        crossover = L / (2 * m)
+        t = np.asarray(t, dtype=np.float64)
+        inner = m * m * t
+        with np.errstate(divide='ignore'):
+            outer = L * m - L * L / (4 * t)
+        return np.where(t <= crossover, inner, outer)
+
+    def _sample_residues(self, shots, rng):
+        """
+        Échantillonne u (centré) selon le noyau de Fejér par rejet.
+
+        La proposition est la densité continue min(m², L²/(4x²)), arrondie à
+        l'entier le plus proche ; elle domine le noyau à un facteur 9/4 près,
+        le taux d'acceptation reste donc supérieur à ~20 % quelle que soit la
+        taille du registre.
+        """
+        m, L = self.count, self._L
+        crossover = L / (2.0 * m)
+        low, high = -(L // 2), L - L // 2 - 1
+        accepted = []
+        remaining = shots
+        while remaining > 0:
+            batch = max(2 * remaining, 16)
+            in_center = rng.random(batch) < 0.5
+            x = np.where(
+                in_center,
+                rng.uniform(-crossover, crossover, batch),
+                np.where(rng.random(batch) < 0.5, 1.0, -1.0) * crossover / (1.0 - rng.random(batch)),
+            )
+            x = np.floor(x + 0.5)
+            x = x[(x >= low) & (x <= high)]
+            if x.size == 0:
+                continue
+            if self._int_dtype is object:
+                u = np.array([int(value) for value in x], dtype=object)
+            else:
+                u = x.astype(np.int64)
+            abs_u = np.abs(x)
+            proposal = np.where(
+                abs_u == 0,
+                2 * self._envelope_mass(np.full(abs_u.shape, 0.5)),
+                self._envelope_mass(abs_u + 0.5) - self._envelope_mass(np.maximum(abs_u - 0.5, 0.0)),
+            )
+            keep = rng.random(u.size) * 2.25 * proposal < self._fejer(u)
+            accepted.append(u[keep][:remaining])
+            remaining -= len(accepted[-1])
+        return np.concatenate(accepted)
+
+    def sample_fourier(self, shots=1, rng=None):
+        """
+        Simule des mesures après IQFT sans matérialiser le vecteur d'état.
+
+        Args:
+            shots: Le nombre de mesures à simuler
+            rng: Un générateur np.random.Generator (optionnel)
+
+        Returns:
+            np.ndarray: Les résultats de mesure (entiers dans [0, Q))
+        """
+        if rng is None:
+            rng = np.random.default_rng()
+        L, g = self._L, self._g
+        u = self._sample_residues(shots, rng)
+        # Relever u = (r/g)*k mod L en k, puis choisir uniformément parmi les
+        # g antécédents k + t*L (ils ont tous la même probabilité).
+        base = (u % L) * self._r_inverse % L
+        offsets = rng.integers(0, g, size=shots).astype(self._int_dtype)
+        results = base + offsets * L
+        if self.Q <= np.iinfo(np.int64).max:
+            return results.astype(np.int64)
+        return results
+
+    def sample_support(self, shots=1, rng=None):
+        """
+        Simule des mesures de l'état périodique (avant IQFT) : x0 + j*r avec j uniforme.
+        """
+        if rng is None:
+            rng = np.random.default_rng()
+        j = rng.integers(0, self.count, size=shots)
+        return self.x0 + j * self.r
+
+    def __str__(self):
+        return f"État périodique (Q={self.Q}, x0={self.x0}, r={self.r}, {self.count} termes)"
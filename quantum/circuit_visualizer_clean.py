@@ -1,78 +1,227 @@
-import streamlit as st
-import plotly.graph_objects as go
 import numpy as np
 
+
+# Au-delà de ce nombre d'états, la distribution est regroupée en intervalles
+# et tracée sur un axe numérique en WebGL plutôt qu'en barres catégorielles.
+MAX_PLOT_POINTS = 2000
+
+
+def downsample_peaks(states, probabilities, max_points=MAX_PLOT_POINTS):
+    """
+    Réduit une distribution à au plus max_points points en découpant l'axe
+    des états en intervalles réguliers et en gardant, dans chacun, l'état le
+    plus probable : les pics conservent leur position et leur hauteur exactes.
+
+    Args:
+        states: Les indices des états (croissants)
+        probabilities: Les probabilités correspondantes
+        max_points: Le nombre maximal de points conservés
+
+    Returns:
+        tuple: (états, probabilités) retenus
+    """
+    states = np.asarray(states)
+    probabilities = np.asarray(probabilities)
+    if len(states) <= max_points:
+        return states, probabilities
+    edges = np.linspace(states[0], states[-1] + 1, max_points + 1)
+    bins = np.searchsorted(edges, states, side='right') - 1
+    # Tri par intervalle puis par probabilité : le dernier de chaque intervalle est son maximum
+    order = np.lexsort((probabilities, bins))
+    last_of_bin = np.r_[bins[order][1:] != bins[order][:-1], True]
+    kept = np.sort(order[last_of_bin])
+    return states[kept], probabilities[kept]
+
+
+def _graph_objects():
+    """
+    Importe plotly à la première utilisation seulement, pour que les modules
+    qui n'affichent rien ne paient pas son temps de chargement.
+    """
+    import plotly.graph_objects as go
+    return go
+
+
+# Portes dessinées par une boîte sur chaque qubit (les autres couvrent tous leurs qubits)
+SINGLE_QUBIT_GATES = ('H',)
+
+# Au-delà de ce nombre de qubits, le registre est dessiné comme un seul fil
+# groupé (notation « /n ») et chaque porte comme une seule boîte.
+BUNDLE_THRESHOLD = 8
+
+# Indices des traces de la figure du circuit
+_WIRES, _SINGLE_GATES, _LABELS = range(3)
+
+
 class CircuitVisualizer:
-    def __init__(self, num_qubits):
+    def __init__(self, num_qubits, bundle_threshold=BUNDLE_THRESHOLD):
+        """
+        Dessin du circuit à partir d'une liste de portes (type, qubits, étape).
+
+        La figure ne contient qu'un nombre fixe de traces : tous les fils en
+        une seule trace (segments séparés par None), toutes les boîtes des
+        portes à un qubit en une trace de marqueurs, toutes les étiquettes en
+        une trace de texte. Les portes multi-qubits sont des formes. Ajouter une
+        porte complète ces traces sans reconstruire la figure.
+
+        Args:
+            num_qubits: Le nombre de qubits du registre
+            bundle_threshold: Le nombre de qubits au-delà duquel le registre
+                est dessiné comme un fil groupé
+        """
         self.num_qubits = num_qubits
-        self.fig = go.Figure()
-        self._setup_qubit_lines()
-
-    def _setup_qubit_lines(self):
-        for i in range(self.num_qubits):
-            self.fig.add_trace(go.Scatter(
-                x=[0, 10], y=[i, i], mode='lines',
-                line=dict(color='black', width=1), showlegend=False
-            ))
-            self.fig.add_annotation(
-                x=-0.5, y=i, text=f'Q{i}', showarrow=False
-            )
+        self.bundled = num_qubits > bundle_threshold
+        self.gates = []
+        self._build_figure()
+
+    def _rows(self):
+        return [0] if self.bundled else list(range(self.num_qubits))
+
+    def _build_figure(self):
+        go = _graph_objects()
+        rows = self._rows()
+        wire_x = [0, 10, None] * len(rows)
+        wire_y = [value for row in rows for value in (row, row, None)]
+        self.fig = go.Figure(data=[
+            go.Scatter(x=wire_x, y=wire_y, mode='lines', line=dict(color='black', width=1),
+                       hoverinfo='skip'),
+            go.Scatter(x=[], y=[], mode='markers', hoverinfo='skip',
+                       marker=dict(symbol='square', size=26, color='lightblue',
+                                   line=dict(color='black', width=1))),
+            go.Scatter(x=[], y=[], text=[], mode='text', hoverinfo='skip',
+                       textfont=dict(size=15, color='black')),
+        ])
+        if self.bundled:
+            tick_text = [f'Q0…Q{self.num_qubits - 1}']
+            y_range = [-1, 1]
+        else:
+            tick_text = [f'Q{i}' for i in rows]
+            y_range = [-1, self.num_qubits]
         self.fig.update_layout(
             title='Circuit Quantique', xaxis_title='Étapes', yaxis_title='Qubits',
-            showlegend=False, xaxis=dict(range=[0, 8]), yaxis=dict(range=[-1, self.num_qubits]),
+            showlegend=False, xaxis=dict(range=[0, 8]),
+            yaxis=dict(range=y_range, tickvals=rows, ticktext=tick_text, showgrid=False, zeroline=False),
             plot_bgcolor='rgba(0,0,0,0)', paper_bgcolor='rgba(0,0,0,0)',
             margin=dict(l=50, r=50, t=50, b=50)
         )
+        if self.bundled:
+            # Barre oblique du fil groupé, annotée du nombre de qubits
+            self.fig.add_annotation(x=0.4, y=0, text=f'/{self.num_qubits}', showarrow=False,
+                                    font=dict(size=12), yshift=10)
 
-    def add_gate(self, gate_type, qubit_indices, step):
-        if not qubit_indices:
-            return
+        # Toutes les portes déjà présentes sont ajoutées en un seul lot
+        single_x, single_y, label_x, label_y, labels, shapes = [], [], [], [], [], []
+        for gate_type, qubit_indices, step in self.gates:
+            self._layout_gate(gate_type, qubit_indices, step, single_x, single_y,
+                              label_x, label_y, labels, shapes)
+        self._extend(single_x, single_y, label_x, label_y, labels, shapes)
 
-        # Pour les portes à un seul qubit (comme H), dessinez une boîte sur chaque ligne de qubit.
-        if gate_type in ['H']:
-            for qubit_idx in qubit_indices:
-                self.fig.add_annotation(
-                    x=step, y=qubit_idx, text=gate_type, showarrow=False,
-                    font=dict(size=15), bgcolor='lightblue', bordercolor='black',
-                    borderwidth=1, borderpad=4, opacity=0.9
-                )
+    def _layout_gate(self, gate_type, qubit_indices, step, single_x, single_y,
+                     label_x, label_y, labels, shapes):
+        """
+        Calcule les éléments graphiques d'une porte et les ajoute aux listes.
+        """
+        if self.bundled:
+            # Une boîte unique sur le fil groupé
+            label = f'{gate_type}⊗{len(qubit_indices)}' if gate_type in SINGLE_QUBIT_GATES else gate_type
+            min_q = max_q = 0
+        elif gate_type in SINGLE_QUBIT_GATES:
+            # Une boîte sur chaque ligne de qubit
+            single_x.extend([step] * len(qubit_indices))
+            single_y.extend(qubit_indices)
+            label_x.extend([step] * len(qubit_indices))
+            label_y.extend(qubit_indices)
+            labels.extend([gate_type] * len(qubit_indices))
             return
+        else:
+            # Une seule grande boîte couvrant les qubits
+            label = gate_type
+            min_q, max_q = min(qubit_indices), max(qubit_indices)
+        shapes.append(dict(
+            type="rect", x0=step - 0.5, y0=min_q - 0.5, x1=step + 0.5, y1=max_q + 0.5,
+            line=dict(color="black", width=1), fillcolor="lightblue", layer="below"
+        ))
+        label_x.append(step)
+        label_y.append((min_q + max_q) / 2)
+        labels.append(label)
 
-        # Pour les portes multi-qubits (O, IQFT, M), dessinez une seule grande boîte.
-        min_q, max_q = min(qubit_indices), max(qubit_indices)
-        
-        # Dessiner une seule boîte couvrant les qubits
-        self.fig.add_shape(
-            type="rect",
-            x0=step - 0.5, y0=min_q - 0.5,
-            x1=step + 0.5, y1=max_q + 0.5,
-            line=dict(color="black", width=1),
-            fillcolor="lightblue",
-            layer="below"
-        )
-        
-        # Ajouter l'étiquette de la porte au centre de la boîte
-        self.fig.add_annotation(
-            x=step, y=(min_q + max_q) / 2,
-            text=gate_type,
-            showarrow=False,
-            font=dict(size=15, color="black"),
-        )
+    def _extend(self, single_x, single_y, label_x, label_y, labels, shapes):
+        data = self.fig.data
+        if single_x:
+            data[_SINGLE_GATES].x = tuple(data[_SINGLE_GATES].x) + tuple(single_x)
+            data[_SINGLE_GATES].y = tuple(data[_SINGLE_GATES].y) + tuple(single_y)
+        if labels:
+            data[_LABELS].x = tuple(data[_LABELS].x) + tuple(label_x)
+            data[_LABELS].y = tuple(data[_LABELS].y) + tuple(label_y)
+            data[_LABELS].text = tuple(data[_LABELS].text or ()) + tuple(labels)
+        if shapes:
+            self.fig.layout.shapes = tuple(self.fig.layout.shapes) + tuple(shapes)
+
+    def add_gate(self, gate_type, qubit_indices, step):
+        if not qubit_indices:
+            return
+        qubit_indices = list(qubit_indices)
+        self.gates.append((gate_type, qubit_indices, step))
+        single_x, single_y, label_x, label_y, labels, shapes = [], [], [], [], [], []
+        self._layout_gate(gate_type, qubit_indices, step, single_x, single_y,
+                          label_x, label_y, labels, shapes)
+        self._extend(single_x, single_y, label_x, label_y, labels, shapes)
 
-    def plot_probabilities(self, state_vector):
+    def plot_probabilities(self, state_vector, max_points=MAX_PLOT_POINTS):
         if state_vector is None: return None
         probabilities = np.abs(state_vector)**2
         significant_indices = np.where(probabilities > 1e-9)[0]
-        if len(significant_indices) == 0: return None
-        
-        states_to_plot = significant_indices
-        probs_to_plot = probabilities[significant_indices]
+        return self._probability_figure(significant_indices, probabilities[significant_indices], max_points)
+
+    def plot_basis_state(self, index):
+        """
+        Trace l'état de base |index> (probabilité 1), par exemple l'état après mesure.
+        """
+        return self._probability_figure(np.array([index]), np.array([1.0]))
+
+    def plot_sparse_state(self, sparse_state, max_points=MAX_PLOT_POINTS):
+        """
+        Trace les probabilités d'un SparseState directement depuis son support.
+        """
+        indices, probabilities = sparse_state.probabilities()
+        return self._probability_figure(indices, probabilities, max_points)
+
+    def plot_register_probabilities(self, register, max_points=MAX_PLOT_POINTS):
+        """
+        Trace les probabilités d'un QuantumRegister en parcourant son état bloc
+        par bloc (utile en stockage 'memmap', où le vecteur n'est jamais chargé en entier).
+        """
+        if register is None: return None
+        significant_indices, probabilities = register.get_significant_probabilities(1e-9)
+        return self._probability_figure(significant_indices, probabilities, max_points)
+
+    def _probability_figure(self, states_to_plot, probs_to_plot, max_points=MAX_PLOT_POINTS):
+        if len(states_to_plot) == 0: return None
+        go = _graph_objects()
+
+        if len(states_to_plot) <= max_points:
+            fig = go.Figure(data=[go.Bar(x=states_to_plot, y=probs_to_plot)])
+            fig.update_layout(
+                title="Probabilités des états de mesure finaux",
+                xaxis_title="État (valeur décimale)", yaxis_title="Probabilité",
+                xaxis=dict(type='category')
+            )
+            return fig
 
-        fig = go.Figure(data=[go.Bar(x=states_to_plot, y=probs_to_plot)])
+        # Grand registre : pics par intervalle, tracés en bâtons dans une seule
+        # trace WebGL (x, x, None) / (0, p, None) sur un axe numérique.
+        states, probs = downsample_peaks(states_to_plot, probs_to_plot, max_points)
+        x = np.repeat(states.astype(np.float64), 3)
+        y = np.zeros(3 * len(states))
+        x[2::3] = np.nan
+        y[1::3] = probs
+        y[2::3] = np.nan
+        fig = go.Figure(data=[go.Scattergl(x=x, y=y, mode='lines', line=dict(width=1), connectgaps=False)])
         fig.update_layout(
-            title="Probabilités des états de mesure finaux",
+            title=f"Probabilités des états de mesure finaux ({len(states_to_plot)} états, "
+                  f"maximum sur {len(states)} intervalles)",
             xaxis_title="État (valeur décimale)", yaxis_title="Probabilité",
-            xaxis=dict(type='category')
+            xaxis=dict(type='linear')
         )
         return fig
 
@@ -80,6 +229,5 @@ class CircuitVisualizer:
         return self.fig
 
     def reset(self):
-        self.fig.data = []
-        self.fig.layout.annotations = []
-        self._setup_qubit_lines()
+        self.gates = []
+        self._build_figure()
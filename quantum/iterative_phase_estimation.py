@@ -0,0 +1,94 @@
+"""
+Estimation de phase itérative (semi-classique), à un seul qubit de contrôle.
+
+La QFT inverse suivie d'une mesure peut être remplacée par une suite de
+mesures d'un seul qubit, chacune suivie de corrections de phase commandées
+classiquement par les bits déjà obtenus (Kitaev, Griffiths-Niu, Beauregard).
+Le registre de comptage de 2n qubits n'existe alors jamais : on réutilise un
+seul qubit de contrôle, et l'état simulé se réduit au registre de travail
+(ceil(log2 N) qubits) plus ce qubit.
+
+Le qubit de contrôle est le qubit 0 (poids fort) du registre ; le registre
+de travail occupe les qubits suivants.
+"""
+import numpy as np
+
+from quantum.quantum_register import QuantumRegister, MAX_CIRCUIT_STATE_SIZE
+
+CONTROL_QUBIT = 0
+
+
+def work_register_qubits(n):
+    """Nombre de qubits du registre de travail : assez pour représenter N - 1."""
+    return max(1, (n - 1).bit_length())
+
+
+def create_iterative_register(n, precision='double'):
+    """
+    Crée le registre (qubit de contrôle + registre de travail) de l'estimation itérative.
+    """
+    num_qubits = work_register_qubits(n) + 1
+    if 2**num_qubits > MAX_CIRCUIT_STATE_SIZE:
+        raise ValueError(f"Le registre de travail de N={n} dépasse la taille maximale "
+                         f"({2**num_qubits} > {MAX_CIRCUIT_STATE_SIZE} amplitudes)")
+    return QuantumRegister(num_qubits, precision=precision)
+
+
+def multiplication_permutation(multiplier, n, work_qubits):
+    """
+    Retourne la permutation y -> multiplier·y mod N du registre de travail
+    (identité sur les valeurs y >= N, pour rester une permutation).
+    """
+    y = np.arange(2**work_qubits, dtype=np.int64)
+    permutation = y.copy()
+    valid = y < n
+    permutation[valid] = (multiplier * y[valid]) % n
+    return permutation
+
+
+def iterative_phase_estimation(register, a, n, num_bits, on_bit=None, work_state=None):
+    """
+    Estime la phase de U|y> = |a·y mod N> bit par bit, du poids faible au
+    poids fort. La distribution du résultat est celle de la mesure du
+    registre de comptage de num_bits qubits après la QFT inverse.
+
+    Pour le bit t, on prépare le contrôle dans (|0> + |1>)/√2, on applique
+    U^(2^(num_bits-1-t)) contrôlé, on retire la phase due aux t bits déjà
+    connus, puis on applique H et on mesure le contrôle.
+
+    Args:
+        register: Le registre créé par create_iterative_register
+        a: La base
+        n: Le nombre à factoriser
+        num_bits: La taille du registre de comptage simulé
+        on_bit: Fonction optionnelle appelée avec (t, bit) après chaque mesure
+        work_state: L'état initial du registre de travail (vecteur de
+            2^work_qubits amplitudes), |1> par défaut ; un vecteur propre de U
+            donne directement la phase correspondante
+
+    Returns:
+        int: La mesure s (entier de num_bits bits)
+    """
+    work_qubits = register.num_qubits - 1
+    # Contrôle à |0> : le registre de travail occupe la première moitié du vecteur
+    state = np.zeros(2**register.num_qubits, dtype=register.dtype)
+    if work_state is None:
+        state[1] = 1
+    else:
+        state[:2**work_qubits] = work_state
+    register.state = state
+
+    measurement = 0
+    for t in range(num_bits):
+        register.reset_qubit(CONTROL_QUBIT)
+        register.apply_hadamard(CONTROL_QUBIT)
+        multiplier = pow(a, 2**(num_bits - 1 - t), n)
+        register.apply_controlled_permutation(CONTROL_QUBIT, multiplication_permutation(multiplier, n, work_qubits))
+        if measurement:
+            register.apply_phase(-2 * np.pi * measurement / 2**(t + 1), CONTROL_QUBIT)
+        register.apply_hadamard(CONTROL_QUBIT)
+        bit = register.measure_qubit(CONTROL_QUBIT)
+        measurement |= bit << t
+        if on_bit is not None:
+            on_bit(t, bit)
+    return measurement
@@ -0,0 +1,158 @@
+import os
+import tempfile
+import weakref
+
+import numpy as np
+
+
+def create_state_file(size, dtype, directory=None):
+    """
+    Crée un vecteur d'état sur disque (np.memmap) rempli de zéros.
+
+    Le fichier est temporaire : il est supprimé quand le tableau n'est plus
+    référencé.
+
+    Args:
+        size: Le nombre d'amplitudes
+        dtype: Le type des amplitudes (complex64 ou complex128)
+        directory: Le dossier où créer le fichier (dossier temporaire par défaut)
+
+    Returns:
+        np.memmap: Le vecteur d'état, initialisé à zéro
+    """
+    descriptor, path = tempfile.mkstemp(prefix='shor_state_', suffix='.bin', dir=directory)
+    os.close(descriptor)
+    state = np.memmap(path, dtype=dtype, mode='w+', shape=(size,))
+    weakref.finalize(state, _remove_file, path)
+    return state
+
+
+def _remove_file(path):
+    try:
+        os.remove(path)
+    except OSError:
+        pass
+
+
+def iter_chunks(size, chunk_size):
+    """
+    Découpe [0, size) en intervalles (début, fin) d'au plus chunk_size éléments.
+    """
+    for start in range(0, size, chunk_size):
+        yield start, min(start + chunk_size, size)
+
+
+def fill(state, value, chunk_size):
+    """
+    Écrit la même valeur dans tout le vecteur, bloc par bloc.
+    """
+    for start, stop in iter_chunks(len(state), chunk_size):
+        state[start:stop] = value
+    if isinstance(state, np.memmap):
+        state.flush()
+
+
+def iter_pair_blocks(view, chunk_size):
+    """
+    Parcourt une vue (2^k, 2, 2^(n-k-1)) par blocs d'au plus chunk_size
+    amplitudes, en renvoyant les composantes |0> et |1> du qubit ciblé
+    ainsi que l'indice plat du premier élément de la composante |0>.
+    """
+    outer, _, inner = view.shape
+    if 2 * inner <= chunk_size:
+        step = max(1, chunk_size // (2 * inner))
+        for i in range(0, outer, step):
+            yield view[i:i + step, 0, :], view[i:i + step, 1, :], i * 2 * inner
+    else:
+        step = max(1, chunk_size // 2)
+        for i in range(outer):
+            for j in range(0, inner, step):
+                yield view[i, 0, j:j + step], view[i, 1, j:j + step], i * 2 * inner + j
+
+
+def four_step_ifft(source, destination, chunk_size):
+    """
+    IFFT (normalisée en 1/sqrt(Q), comme la QFT) d'un vecteur sur disque par
+    la décomposition « four-step » de Bailey.
+
+    Le vecteur de taille Q = Q1*Q2 est vu comme une matrice A[n1, n2] = x[Q2*n1 + n2] :
+        1. IFFT de taille Q1 sur chaque colonne, puis multiplication par les
+           facteurs de rotation e^{2πi n2 k1 / Q} ;
+        2. IFFT de taille Q2 sur chaque ligne ; le résultat X[k1 + Q1*k2] est
+           écrit transposé dans destination.
+    Chaque passe ne charge qu'un bloc de colonnes ou de lignes à la fois :
+    la mémoire résidente reste bornée par max(chunk_size, sqrt(Q)) amplitudes.
+
+    Args:
+        source: Le vecteur d'entrée (modifié sur place par la première passe)
+        destination: Le vecteur de sortie, de même taille
+        chunk_size: Le nombre maximal d'amplitudes chargées par bloc
+    """
+    Q = len(source)
+    num_qubits = Q.bit_length() - 1
+    Q1 = 2**(num_qubits // 2)
+    Q2 = Q // Q1
+    dtype = source.dtype
+    matrix = source.reshape(Q1, Q2)
+    output = destination.reshape(Q2, Q1)
+    k1 = np.arange(Q1)
+
+    # 1. Colonnes : IFFT sur n1, puis facteurs de rotation
+    columns = max(1, chunk_size // Q1)
+    for start in range(0, Q2, columns):
+        stop = min(start + columns, Q2)
+        block = np.fft.ifft(np.asarray(matrix[:, start:stop]), axis=0)
+        block *= np.exp(2j * np.pi * np.outer(k1, np.arange(start, stop)) / Q)
+        matrix[:, start:stop] = block
+
+    # 2. Lignes : IFFT sur n2, écriture transposée et normalisation
+    rows = max(1, chunk_size // Q2)
+    scale = np.sqrt(Q)
+    for start in range(0, Q1, rows):
+        stop = min(start + rows, Q1)
+        block = np.fft.ifft(np.asarray(matrix[start:stop, :]), axis=1)
+        block *= scale
+        output[:, start:stop] = block.T.astype(dtype, copy=False)
+
+    for array in (source, destination):
+        if isinstance(array, np.memmap):
+            array.flush()
+
+
+def chunk_masses(state, chunk_size):
+    """
+    Retourne la probabilité cumulée à la fin de chaque bloc (cumul en double).
+    """
+    masses = [np.sum(np.abs(state[start:stop])**2, dtype=np.float64)
+              for start, stop in iter_chunks(len(state), chunk_size)]
+    return np.cumsum(masses)
+
+
+def sample_chunked(state, cumulative_masses, chunk_size, u):
+    """
+    Inverse la fonction de répartition pour des tirages uniformes u, sans
+    charger tout le vecteur : on localise d'abord le bloc de chaque tirage
+    grâce aux masses cumulées par bloc, puis on ne lit que les blocs concernés.
+
+    Args:
+        state: Le vecteur d'état
+        cumulative_masses: Les masses cumulées par bloc (voir chunk_masses)
+        chunk_size: La taille des blocs
+        u: Les tirages, dans [0, masse totale)
+
+    Returns:
+        np.ndarray: Les indices mesurés
+    """
+    u = np.asarray(u, dtype=np.float64)
+    chunk_indices = np.minimum(np.searchsorted(cumulative_masses, u, side='right'),
+                               len(cumulative_masses) - 1)
+    results = np.empty(u.shape, dtype=np.int64)
+    for chunk in np.unique(chunk_indices):
+        selected = chunk_indices == chunk
+        start = int(chunk) * chunk_size
+        stop = min(start + chunk_size, len(state))
+        offset = cumulative_masses[chunk - 1] if chunk > 0 else 0.0
+        local_cdf = offset + np.cumsum(np.abs(state[start:stop])**2, dtype=np.float64)
+        local = np.searchsorted(local_cdf, u[selected], side='right')
+        results[selected] = start + np.minimum(local, stop - start - 1)
+    return results
@@ -0,0 +1,97 @@
+import numpy as np
+
+
+class SparseState:
+    def __init__(self, size, indices, amplitudes):
+        """
+        Vecteur d'état creux : seules les amplitudes non nulles sont stockées,
+        avec leurs indices (triés). La mémoire et le temps de calcul sont
+        proportionnels au support plutôt qu'à la taille 2^n.
+
+        Args:
+            size: La taille du vecteur dense correspondant (2^n)
+            indices: Les indices des amplitudes non nulles, croissants
+            amplitudes: Les amplitudes correspondantes
+        """
+        indices = np.asarray(indices, dtype=np.int64)
+        amplitudes = np.asarray(amplitudes)
+        if indices.shape != amplitudes.shape or indices.ndim != 1:
+            raise ValueError("Les indices et les amplitudes doivent être deux tableaux 1D de même taille")
+        if indices.size and (indices[0] < 0 or indices[-1] >= size):
+            raise ValueError(f"Les indices doivent être dans [0, {size})")
+        self.size = size
+        self.indices = indices
+        self.amplitudes = amplitudes
+
+    @classmethod
+    def basis(cls, size, index, dtype=np.complex128):
+        """État de base |index>."""
+        return cls(size, np.array([index]), np.ones(1, dtype=dtype))
+
+    @classmethod
+    def periodic(cls, size, x0, r, dtype=np.complex128):
+        """Superposition uniforme des |x0 + j*r>, comme après l'oracle."""
+        indices = np.arange(x0, size, r, dtype=np.int64)
+        return cls(size, indices, np.full(indices.size, 1 / np.sqrt(indices.size), dtype=dtype))
+
+    @classmethod
+    def from_dense(cls, vector, threshold=1e-10):
+        """
+        Construit l'état creux des amplitudes de module supérieur au seuil.
+        """
+        indices = np.flatnonzero(np.abs(vector) > threshold)
+        return cls(len(vector), indices, np.asarray(vector[indices]))
+
+    @property
+    def nbytes(self):
+        return self.indices.nbytes + self.amplitudes.nbytes
+
+    def __len__(self):
+        return self.indices.size
+
+    def to_dense(self, dtype=None):
+        """
+        Matérialise le vecteur dense (par exemple avant une IQFT).
+        """
+        vector = np.zeros(self.size, dtype=dtype or self.amplitudes.dtype)
+        vector[self.indices] = self.amplitudes
+        return vector
+
+    def probabilities(self):
+        """
+        Retourne (indices, probabilités) des états du support.
+        """
+        return self.indices, np.abs(self.amplitudes)**2
+
+    def sample(self, shots, rng, nonzero=False):
+        """
+        Tire des mesures par inversion de la table cumulée du support.
+
+        Args:
+            shots: Le nombre de mesures
+            rng: Un générateur numpy
+            nonzero: Exclure l'état |0> s'il reste de la probabilité ailleurs
+        """
+        indices, probabilities = self.probabilities()
+        if indices.size == 0 or not probabilities.sum() > 0:
+            raise ValueError("Impossible de mesurer un état creux sans amplitude non nulle")
+        if nonzero and indices.size and indices[0] == 0 and probabilities[1:].sum() > 1e-12:
+            indices, probabilities = indices[1:], probabilities[1:]
+        cdf = np.cumsum(probabilities, dtype=np.float64)
+        positions = np.searchsorted(cdf, rng.random(shots) * cdf[-1], side='right')
+        return indices[np.minimum(positions, indices.size - 1)]
+
+    def format(self, num_qubits, offset=0):
+        """
+        Une ligne « |x>: amplitude » par amplitude du support, x en binaire.
+
+        Args:
+            num_qubits: Le nombre de bits affichés
+            offset: Décalage ajouté aux indices (état représentant un bloc)
+        """
+        return ''.join(f"|{offset + index:0{num_qubits}b}>: {amplitude}\n"
+                       for index, amplitude in zip(self.indices.tolist(), self.amplitudes.tolist()))
+
+    def __str__(self):
+        num_qubits = max(1, (self.size - 1).bit_length())
+        return f"État creux ({len(self)} amplitudes sur {self.size}) :\n{self.format(num_qubits)}"
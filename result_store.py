@@ -0,0 +1,196 @@
+"""
+Stockage persistant des résultats déjà calculés (SQLite en mode WAL).
+
+Les périodes obtenues par une exécution quantique réussie et les
+factorisations finales sont conservées d'un processus à l'autre : un N déjà
+résolu n'a plus besoin de repasser par l'étape quantique. Les ordres de a
+modulo N n'y sont pas : multiplicative_order (en cache) les calcule plus vite
+qu'une requête. Le mode WAL permet à plusieurs processus (sessions
+Streamlit, processus de batch.py) de lire pendant qu'un autre écrit ; une
+lecture n'écrit jamais dans la base.
+
+Chaque base est marquée d'un numéro de version (STORE_VERSION) : si le format
+ou la logique des résultats change, le numéro est incrémenté et les entrées
+d'une version différente sont effacées à l'ouverture. Au-delà de max_bytes,
+les entrées les moins récemment utilisées sont supprimées (les dates de
+lecture sont gardées en mémoire et écrites avec l'écriture suivante).
+Exemple :
+
+    store = open_store()
+    ShorRunner(91, store=store).run()
+"""
+import json
+import os
+import sqlite3
+import threading
+import time
+
+# À incrémenter quand le format ou la signification des entrées change
+STORE_VERSION = 2
+
+# Emplacement par défaut de la base, modifiable par la variable d'environnement
+STORE_PATH_VARIABLE = 'SHOR_RESULT_STORE'
+DEFAULT_STORE_PATH = os.path.join(os.path.expanduser('~'), '.cache', 'shor-simulator', 'results.sqlite3')
+
+DEFAULT_MAX_BYTES = 32 * 2**20
+
+# Une éviction ramène la taille à cette fraction de max_bytes
+EVICTION_TARGET = 0.8
+
+_stores = {}
+_stores_lock = threading.Lock()
+
+
+class ResultStore:
+    def __init__(self, path=None, max_bytes=DEFAULT_MAX_BYTES, version=STORE_VERSION):
+        """
+        Ouvre (ou crée) la base de résultats.
+
+        Args:
+            path: Le fichier SQLite (DEFAULT_STORE_PATH ou la variable
+                d'environnement SHOR_RESULT_STORE par défaut ; ':memory:'
+                pour une base temporaire)
+            max_bytes: La taille maximale des valeurs stockées, au-delà de
+                laquelle les entrées les moins récemment utilisées sont supprimées
+            version: Le numéro de version des entrées ; celles d'une autre
+                version sont effacées
+        """
+        if path is None:
+            path = os.environ.get(STORE_PATH_VARIABLE, DEFAULT_STORE_PATH)
+        if path != ':memory:':
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self.path = path
+        self.max_bytes = max_bytes
+        self.version = version
+        # Une connexion partagée entre les threads (Streamlit), protégée par un verrou
+        self._lock = threading.Lock()
+        # Dates de lecture en attente d'écriture : (kind, key) -> date
+        self._accessed = {}
+        self._connection = sqlite3.connect(path, check_same_thread=False, isolation_level=None, timeout=5.0)
+        with self._lock:
+            self._connection.execute('PRAGMA journal_mode=WAL')
+            self._connection.execute('PRAGMA synchronous=NORMAL')
+            self._connection.execute('CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT)')
+            self._connection.execute(
+                'CREATE TABLE IF NOT EXISTS results ('
+                'kind TEXT, key TEXT, value TEXT, size INTEGER, accessed REAL, '
+                'PRIMARY KEY (kind, key))')
+            self._connection.execute('CREATE INDEX IF NOT EXISTS results_accessed ON results (accessed)')
+            row = self._connection.execute("SELECT value FROM meta WHERE key = 'version'").fetchone()
+            if row is None or row[0] != str(version):
+                # Entrées d'une autre version : elles ne sont plus fiables
+                self._connection.execute('DELETE FROM results')
+                self._connection.execute("INSERT OR REPLACE INTO meta VALUES ('version', ?)", (str(version),))
+            self._size = self._connection.execute('SELECT COALESCE(SUM(size), 0) FROM results').fetchone()[0]
+
+    @staticmethod
+    def _key(*parts):
+        # Les entiers sont écrits en décimal : N peut dépasser 64 bits
+        return ':'.join(str(part) for part in parts)
+
+    def _get(self, kind, key):
+        with self._lock:
+            row = self._connection.execute(
+                'SELECT value FROM results WHERE kind = ? AND key = ?', (kind, key)).fetchone()
+            if row is None:
+                return None
+            # Pas d'UPDATE ici : une lecture prendrait le verrou d'écriture de la base
+            self._accessed[(kind, key)] = time.time()
+        return json.loads(row[0])
+
+    def _flush_accesses(self):
+        """Écrit les dates de lecture en attente. Appelée verrou pris."""
+        if not self._accessed:
+            return
+        self._connection.executemany(
+            'UPDATE results SET accessed = ? WHERE kind = ? AND key = ?',
+            [(accessed, kind, key) for (kind, key), accessed in self._accessed.items()])
+        self._accessed.clear()
+
+    def _put(self, kind, key, value):
+        value = json.dumps(value)
+        size = len(kind) + len(key) + len(value)
+        with self._lock:
+            # Dates de lecture, insertion et éviction dans une seule transaction d'écriture
+            self._connection.execute('BEGIN IMMEDIATE')
+            try:
+                self._flush_accesses()
+                self._connection.execute(
+                    'INSERT OR REPLACE INTO results VALUES (?, ?, ?, ?, ?)', (kind, key, value, size, time.time()))
+                # Estimation par excès (une entrée remplacée est comptée deux fois),
+                # recalculée exactement à chaque éviction
+                self._size += size
+                if self._size > self.max_bytes:
+                    self._evict()
+            except BaseException:
+                self._connection.execute('ROLLBACK')
+                raise
+            self._connection.execute('COMMIT')
+
+    def _evict(self):
+        """
+        Supprime les entrées les moins récemment utilisées jusqu'à revenir
+        sous EVICTION_TARGET * max_bytes. Appelée verrou pris.
+        """
+        target = EVICTION_TARGET * self.max_bytes
+        self._size = self._connection.execute('SELECT COALESCE(SUM(size), 0) FROM results').fetchone()[0]
+        if self._size <= self.max_bytes:
+            return
+        rows = self._connection.execute('SELECT rowid, size FROM results ORDER BY accessed')
+        evicted = []
+        for rowid, size in rows:
+            if self._size <= target:
+                break
+            evicted.append((rowid,))
+            self._size -= size
+        self._connection.executemany('DELETE FROM results WHERE rowid = ?', evicted)
+
+    # --- Périodes obtenues par une exécution quantique ---
+    def get_period(self, n, a, num_qubits, precision):
+        """
+        Période décodée lors d'une exécution réussie de (N, a) avec ce
+        registre et cette précision, ou None.
+        """
+        return self._get('period', self._key(n, a, num_qubits, precision))
+
+    def put_period(self, n, a, num_qubits, precision, period):
+        self._put('period', self._key(n, a, num_qubits, precision), period)
+
+    # --- Factorisations ---
+    def get_factors(self, n):
+        """
+        Factorisation connue de N : dictionnaire {'factors', 'method', 'a'}, ou None.
+        """
+        return self._get('factors', self._key(n))
+
+    def put_factors(self, n, factors, method, a=None):
+        self._put('factors', self._key(n), {'factors': sorted(factors), 'method': method, 'a': a})
+
+    def __len__(self):
+        with self._lock:
+            return self._connection.execute('SELECT COUNT(*) FROM results').fetchone()[0]
+
+    def clear(self):
+        with self._lock:
+            self._connection.execute('DELETE FROM results')
+            self._accessed.clear()
+            self._size = 0
+
+    def close(self):
+        with self._lock:
+            self._flush_accesses()
+            self._connection.close()
+
+
+def open_store(path=None, max_bytes=DEFAULT_MAX_BYTES):
+    """
+    Retourne la base de résultats du fichier donné, partagée par tout le
+    processus (une seule connexion par fichier).
+    """
+    if path is None:
+        path = os.environ.get(STORE_PATH_VARIABLE, DEFAULT_STORE_PATH)
+    with _stores_lock:
+        store = _stores.get(path)
+        if store is None:
+            store = _stores[path] = ResultStore(path, max_bytes)
+        return store
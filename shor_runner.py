@@ -0,0 +1,538 @@
+import itertools
+import math
+import random
+import sqlite3
+import time
+
+import numpy as np
+
+from instrumentation import instrumented, span
+from quantum.quantum_register import QuantumRegister, MAX_CIRCUIT_STATE_SIZE
+from quantum.iterative_phase_estimation import create_iterative_register, iterative_phase_estimation
+from classical.preprocessing import Preprocessor, BaseScheduler
+from classical.order import multiplicative_order
+from classical.decode_index import DECODE_INDEX_MAX_QUBITS, get_decode_index
+from classical.continued_fraction import iter_convergents, iter_rational_coefficients
+
+# Au-delà de ce nombre de qubits, le vecteur d'état dense n'est plus alloué :
+# le registre utilise le backend analytique (formule fermée de la distribution).
+DENSE_MAX_QUBITS = 20
+
+# 'standard' : registre de comptage complet puis IQFT ; 'iterative' : un seul
+# qubit de contrôle réutilisé, les bits de la mesure sortent un par un.
+PHASE_ESTIMATION_MODES = ('standard', 'iterative')
+
+
+class StageResult:
+    def __init__(self, name, duration, output):
+        """
+        Résultat d'une étape de l'algorithme.
+
+        Args:
+            name: Le nom de l'étape
+            duration: La durée de l'étape en secondes
+            output: Un dictionnaire des valeurs produites par l'étape
+        """
+        self.name = name
+        self.duration = duration
+        self.output = output
+
+    def to_dict(self):
+        return {'name': self.name, 'duration': self.duration, 'output': self.output}
+
+
+class AttemptResult:
+    def __init__(self, a):
+        """
+        Résultat d'une tentative avec une base 'a' donnée.
+        """
+        self.a = a
+        self.stages = []
+        self.success = False
+        self.factors = None
+        self.method = None
+        self.failure_reason = None
+
+    def to_dict(self):
+        return {
+            'a': self.a,
+            'success': self.success,
+            'factors': list(self.factors) if self.factors else None,
+            'method': self.method,
+            'failure_reason': self.failure_reason,
+            'stages': [stage.to_dict() for stage in self.stages],
+        }
+
+
+class ShorResult:
+    def __init__(self, n):
+        """
+        Résultat complet d'une factorisation : étapes, tentatives et facteurs.
+        """
+        self.n = n
+        self.success = False
+        self.factors = None
+        self.method = None
+        self.preprocessing = None
+        self.attempts = []
+        self.total_duration = 0.0
+
+    def to_dict(self):
+        return {
+            'n': self.n,
+            'success': self.success,
+            'factors': list(self.factors) if self.factors else None,
+            'method': self.method,
+            'preprocessing': self.preprocessing.to_dict() if self.preprocessing else None,
+            'attempts': [attempt.to_dict() for attempt in self.attempts],
+            'total_duration': self.total_duration,
+        }
+
+
+class ShorRunner:
+    def __init__(self, n, max_attempts=20, use_real_oracle=False, precision='double', seed=None, shots=4,
+                 base_ranking=None, classical_shortcuts=False, phase_estimation='standard', store=None,
+                 on_stage=None):
+        """
+        Moteur de l'algorithme de Shor, indépendant de l'interface.
+
+        Il enchaîne le prétraitement, le choix de la base, l'étape quantique,
+        le décodage par fractions continues et l'extraction des facteurs, et
+        chronomètre chaque étape. Aucune dépendance à streamlit ni à plotly :
+        il peut être utilisé depuis un script ou un processus de calcul.
+
+        Args:
+            n: Le nombre à factoriser
+            max_attempts: Le nombre maximal de bases essayées par run()
+            use_real_oracle: Utiliser l'oracle d'exponentiation modulaire réel
+                quand l'état à deux registres tient en mémoire
+            precision: La précision du vecteur d'état ('double' ou 'single')
+            seed: Une graine pour rendre l'exécution reproductible
+            shots: Le nombre maximal d'exécutions quantiques (Hadamard, oracle,
+                IQFT, une mesure) par tentative. Une nouvelle exécution n'est
+                lancée que si les mesures précédentes ne suffisent pas à
+                retrouver la période ; elles sont alors combinées (voir
+                recover_period). Chaque exécution est une étape 'quantum'.
+            base_ranking: Le classement des bases du BaseScheduler (None,
+                'parity' ou 'success')
+            classical_shortcuts: Si True, le prétraitement extrait les
+                facteurs bon marché (petits premiers, Pollard rho) et l'étape
+                quantique n'est lancée que si elle est nécessaire
+            phase_estimation: 'standard' ou 'iterative'. En 'iterative', seuls
+                le registre de travail et un qubit de contrôle sont simulés
+                (voir quantum/iterative_phase_estimation.py) ; une exécution
+                est une estimation complète, comptée comme en 'standard'
+            store: Un ResultStore (voir result_store.py) consulté avant de
+                calculer : périodes déjà trouvées pour (N, a, taille du
+                registre, précision) et factorisations connues. Une période
+                connue évite l'étape quantique ; une factorisation connue évite
+                toutes les tentatives. Si la base est indisponible (verrouillée
+                trop longtemps...), le calcul se fait comme sans stockage.
+            on_stage: Fonction optionnelle appelée avec (tentative, étape)
+                à la fin de chaque étape d'une tentative, pour suivre la
+                progression (éventuellement depuis un autre thread)
+        """
+        if phase_estimation not in PHASE_ESTIMATION_MODES:
+            raise ValueError(f"Mode d'estimation de phase inconnu '{phase_estimation}', "
+                             f"choisir parmi {PHASE_ESTIMATION_MODES}")
+        self.n = n
+        self.max_attempts = max_attempts
+        self.use_real_oracle = use_real_oracle
+        self.precision = precision
+        self.seed = seed
+        self.shots = shots
+        self.base_ranking = base_ranking
+        self.classical_shortcuts = classical_shortcuts
+        self.phase_estimation = phase_estimation
+        self.store = store
+        self.on_stage = on_stage
+
+    @property
+    def num_qubits(self):
+        """Taille du registre de comptage : ceil(log2(N²)) qubits."""
+        # Calcul entier : np.log2 échoue au-delà de 2^64 et arrondit avant
+        return (self.n**2 - 1).bit_length()
+
+    # --- Étapes élémentaires ---
+    def base_scheduler(self, exclude=None):
+        """
+        Crée un BaseScheduler : itérateur des bases à essayer, sans répétition.
+        """
+        return BaseScheduler(self.n, exclude=exclude, ranking=self.base_ranking)
+
+    def choose_base(self, exclude=None):
+        return self.base_scheduler(exclude).next_base()
+
+    def check_base(self, a):
+        """
+        Vérifie la base : retourne (a premier avec N, période paire).
+        """
+        is_coprime = math.gcd(a, self.n) == 1
+        if not is_coprime: return False, False
+        r = self.order(a)
+        return True, r % 2 == 0
+
+    def order(self, a):
+        """
+        Ordre de a modulo N (mis en cache par multiplicative_order).
+        """
+        return multiplicative_order(a, self.n)
+
+    def _call_store(self, method, *args):
+        """
+        Appelle une méthode du stockage persistant. Si la base est
+        indisponible (verrouillée au-delà du délai, disque plein...), un
+        avertissement est affiché et None est retourné : le résultat est
+        alors calculé comme sans stockage.
+        """
+        if self.store is None:
+            return None
+        try:
+            return getattr(self.store, method)(*args)
+        except sqlite3.OperationalError as e:
+            print(f"Avertissement : base de résultats indisponible ({e})")
+            return None
+
+    def known_period(self, a, num_qubits=None):
+        """
+        Période déjà obtenue par une exécution réussie avec la base a (même
+        taille de registre et même précision), ou None.
+        """
+        return self._call_store('get_period', self.n, a, num_qubits or self.num_qubits, self.precision)
+
+    def known_factors(self):
+        """
+        Factorisation de N déjà enregistrée : dictionnaire {'factors',
+        'method', 'a'}, ou None.
+        """
+        return self._call_store('get_factors', self.n)
+
+    def record_result(self, a, period, factors, method='shor'):
+        """
+        Enregistre une factorisation réussie (et la période qui l'a donnée)
+        dans le stockage persistant.
+        """
+        if period is not None:
+            self._call_store('put_period', self.n, a, self.num_qubits, self.precision, period)
+        self._call_store('put_factors', self.n, factors, method, a)
+
+    def real_oracle_fits(self, num_qubits):
+        """L'état à deux registres de l'oracle réel tient-il en mémoire ?"""
+        work_qubits = max(1, (self.n - 1).bit_length())
+        return 2**(num_qubits + work_qubits) <= MAX_CIRCUIT_STATE_SIZE
+
+    def create_register(self, num_qubits=None, keep_state=False):
+        """
+        Crée le registre de comptage avec le backend adapté (en estimation
+        itérative : le qubit de contrôle et le registre de travail).
+
+        Args:
+            num_qubits: La taille du registre (self.num_qubits par défaut)
+            keep_state: Si True, le vecteur d'état est conservé (pour
+                l'afficher) tant qu'il reste de taille raisonnable
+        """
+        if self.phase_estimation == 'iterative':
+            return create_iterative_register(self.n, precision=self.precision)
+        if num_qubits is None:
+            num_qubits = self.num_qubits
+        if self.use_real_oracle and self.real_oracle_fits(num_qubits):
+            backend = 'dense'
+        elif not keep_state or num_qubits > DENSE_MAX_QUBITS:
+            backend = 'analytic'
+        else:
+            # État creux jusqu'à l'IQFT, qui le rend dense
+            backend = 'sparse'
+        return QuantumRegister(num_qubits, backend=backend, precision=self.precision)
+
+    def apply_oracle(self, register, a):
+        use_circuit = (self.use_real_oracle and register.backend == 'dense'
+                       and self.real_oracle_fits(register.num_qubits))
+        register.apply_oracle(a, self.n, mode='circuit' if use_circuit else 'simulated')
+
+    def measure(self, register, shots=None):
+        # On conditionne directement sur une mesure non nulle (potentiellement utile)
+        return register.measure(shots=shots, nonzero=True)
+
+    def run_iterative(self, register, a, shots=None, on_bit=None):
+        """
+        Estimation de phase itérative : une mesure non nulle (ou une liste de
+        shots mesures) du registre de comptage simulé, obtenue bit par bit.
+        """
+        measurements = []
+        for _ in range(1 if shots is None else shots):
+            # Comme pour le registre complet, on conditionne sur une mesure non nulle
+            for _ in range(100):
+                measurement = iterative_phase_estimation(register, a, self.n, self.num_qubits, on_bit)
+                if measurement:
+                    break
+            measurements.append(measurement)
+        return measurements[0] if shots is None else measurements
+
+    def run_quantum(self, register, a, shots=None):
+        """
+        Applique Hadamard, l'oracle et l'IQFT puis mesure le registre (une
+        mesure, ou un tableau de shots mesures).
+        """
+        if self.phase_estimation == 'iterative':
+            return self.run_iterative(register, a, shots)
+        register.apply_hadamard_to_all()
+        self.apply_oracle(register, a)
+        register.apply_iqft()
+        return self.measure(register, shots)
+
+    def find_period(self, a, measurement, num_qubits):
+        """
+        Retrouve la période à partir d'une mesure par fractions continues.
+
+        Returns:
+            tuple: (période ou None, fraction s/Q, convergents)
+        """
+        Q = 2**num_qubits
+        fraction = measurement / Q
+        # Décodage exact sur les entiers (un flottant perd les bits utiles dès
+        # Q > 2^50) ; les convergents de dénominateur >= N sont inutiles.
+        convergents = list(iter_convergents(iter_rational_coefficients(int(measurement), Q), self.n))
+        # Si la table de (a, N, Q) a déjà été construite, une simple lecture suffit
+        index = get_decode_index(a, self.n, num_qubits, build=False)
+        if index is not None:
+            return index.period(measurement), fraction, convergents
+        # a^k ≡ 1 (mod N) si et seulement si l'ordre de a divise k
+        order = self.order(a)
+        for h, k in convergents:
+            if 0 < k < self.n and k % order == 0:
+                return k, fraction, convergents
+        return None, fraction, convergents
+
+    def recover_period(self, a, measurements, num_qubits, max_multiple=4):
+        """
+        Retrouve la période à partir de plusieurs mesures.
+
+        Une mesure s ≈ j·Q/r ne donne par fractions continues que r/pgcd(j, r) :
+        si pgcd(j, r) > 1, elle ne suffit pas seule. On rassemble les
+        dénominateurs des convergents de toutes les mesures, leurs PPCM deux à
+        deux et leurs petits multiples (jusqu'à max_multiple), et on retient le
+        plus petit candidat k < N tel que a^k ≡ 1 (mod N).
+
+        Returns:
+            tuple: (période ou None, confiance, candidats triés). La confiance
+            est la proportion des mesures compatibles avec la période, c'est-à-dire
+            telles que |s/Q - j/r| <= 1/(2Q) pour un entier j.
+        """
+        Q = 2**num_qubits
+        denominators = set()
+        for measurement in measurements:
+            for h, k in iter_convergents(iter_rational_coefficients(int(measurement), Q), self.n):
+                if k > 1:
+                    denominators.add(k)
+
+        candidates = set()
+        for k in denominators:
+            for other in denominators:
+                lcm = k * other // math.gcd(k, other)
+                if lcm < self.n:
+                    candidates.add(lcm)
+        for k in list(candidates):
+            for multiple in range(2, max_multiple + 1):
+                if k * multiple < self.n:
+                    candidates.add(k * multiple)
+        candidates = sorted(candidates)
+
+        period = next((k for k in candidates if pow(a, k, self.n) == 1), None)
+        if period is None:
+            return None, 0.0, candidates
+        consistent = 0
+        for measurement in measurements:
+            scaled = int(measurement) * period
+            j = (2 * scaled + Q) // (2 * Q)
+            consistent += 2 * abs(scaled - j * Q) <= period
+        return period, consistent / len(measurements), candidates
+
+    def success_probability(self, a, num_qubits=None):
+        """
+        Probabilité exacte qu'une exécution quantique avec la base a donne des
+        facteurs non triviaux (distribution du simulateur, voir
+        DecodeIndex.probabilities), ou None si le registre est trop grand pour
+        la tabuler. La table de décodage construite ici sert ensuite à find_period.
+        """
+        if num_qubits is None:
+            num_qubits = self.num_qubits
+        if num_qubits > DECODE_INDEX_MAX_QUBITS or math.gcd(a, self.n) != 1:
+            return None
+        return get_decode_index(a, self.n, num_qubits).success_probability()
+
+    def calculate_factors(self, a, period):
+        """
+        Calcule pgcd(a^(r/2) ± 1, N). Retourne (None, None) si la période est
+        impaire ou si a^(r/2) ≡ -1 (mod N).
+        """
+        if period is None or period % 2 != 0:
+            return None, None
+        x = pow(a, period // 2, self.n)
+        if x == self.n - 1:
+            return None, None
+        return math.gcd(x + 1, self.n), math.gcd(x - 1, self.n)
+
+    # --- Exécution complète ---
+    def _timed(self, attempt, name, function):
+        with span(f'runner.{name}', n=self.n, a=attempt.a):
+            start = time.perf_counter()
+            output = function()
+        stage = StageResult(name, time.perf_counter() - start, output)
+        attempt.stages.append(stage)
+        if self.on_stage is not None:
+            self.on_stage(attempt, stage)
+        return output
+
+    def preprocess(self):
+        """
+        Valide N avec le Preprocessor.
+
+        Returns:
+            StageResult: Le résultat du prétraitement
+        """
+        with span('runner.preprocessing', n=self.n):
+            start = time.perf_counter()
+            preprocessor = Preprocessor(self.n, factor_shortcuts=self.classical_shortcuts)
+            is_valid = preprocessor.validate_number()
+        output = {'is_valid': is_valid, 'validation_steps': preprocessor.get_validation_steps(),
+                  'factors': list(preprocessor.factors) if preprocessor.factors else None}
+        return StageResult('preprocessing', time.perf_counter() - start, output)
+
+    @instrumented('runner.run_attempt', lambda runner, a, cancelled=None: {'n': runner.n, 'a': a})
+    def run_attempt(self, a, cancelled=None):
+        """
+        Exécute une tentative complète avec la base 'a'.
+
+        Args:
+            a: La base
+            cancelled: Un threading.Event optionnel ; s'il est levé, la
+                tentative s'arrête avant son étape suivante (failure_reason
+                'cancelled'), sans rien enregistrer dans le stockage
+
+        Returns:
+            AttemptResult: Les sorties et durées de chaque étape, et les
+            facteurs éventuels (dans l'étape 'factors')
+        """
+        attempt = AttemptResult(a)
+        def periodicity_stage():
+            is_coprime, is_even_period = self.check_base(a)
+            return {'is_coprime': is_coprime, 'is_even_period': is_even_period}
+        periodicity = self._timed(attempt, 'periodicity', periodicity_stage)
+        if not periodicity['is_coprime']:
+            # La base partage déjà un facteur avec N
+            factor = math.gcd(a, self.n)
+            attempt.success, attempt.factors, attempt.method = True, (factor, self.n // factor), 'gcd'
+            self.record_result(a, None, attempt.factors, 'gcd')
+            return attempt
+        if not periodicity['is_even_period']:
+            attempt.failure_reason = 'odd_period'
+            return attempt
+
+        if cancelled is not None and cancelled.is_set():
+            attempt.failure_reason = 'cancelled'
+            return attempt
+        known_period = self.known_period(a)
+        if known_period is not None:
+            # Période déjà trouvée lors d'une exécution précédente : pas d'étape quantique
+            period = self._timed(attempt, 'period_finding', lambda: {
+                'period': known_period, 'fraction': None, 'convergents': [], 'measurements': [],
+                'confidence': None, 'combined': False, 'stored': True})['period']
+            return self._factors_attempt(attempt, a, period)
+
+        def quantum_stage():
+            register = self.create_register()
+            measurement = int(self.run_quantum(register, a))
+            return {'num_qubits': self.num_qubits, 'register_qubits': register.num_qubits,
+                    'backend': register.backend, 'phase_estimation': self.phase_estimation,
+                    'measurement': measurement}
+
+        def period_stage(measurements):
+            if len(measurements) == 1:
+                period, fraction, convergents = self.find_period(a, measurements[0], self.num_qubits)
+                return {'period': period, 'fraction': fraction, 'convergents': convergents,
+                        'measurements': list(measurements), 'confidence': None, 'combined': False,
+                        'stored': False}
+            # La dernière mesure seule ne suffit pas forcément : on combine toutes celles de la tentative
+            period, confidence, _ = self.recover_period(a, measurements, self.num_qubits)
+            return {'period': period, 'fraction': None, 'convergents': [],
+                    'measurements': list(measurements), 'confidence': confidence,
+                    'combined': period is not None, 'stored': False}
+
+        # Une exécution quantique par mesure : on n'en relance une que si les
+        # mesures déjà obtenues ne donnent pas la période
+        measurements = []
+        period = None
+        for _ in range(max(1, self.shots)):
+            if cancelled is not None and cancelled.is_set():
+                attempt.failure_reason = 'cancelled'
+                return attempt
+            measurements.append(self._timed(attempt, 'quantum', quantum_stage)['measurement'])
+            period = self._timed(attempt, 'period_finding', lambda: period_stage(measurements))['period']
+            if period is not None:
+                break
+        if period is None:
+            attempt.failure_reason = 'period_not_found'
+            return attempt
+        if cancelled is not None and cancelled.is_set():
+            attempt.failure_reason = 'cancelled'
+            return attempt
+        return self._factors_attempt(attempt, a, period)
+
+    def _factors_attempt(self, attempt, a, period):
+        """
+        Dernière étape d'une tentative : facteurs à partir de la période.
+        """
+        def factors_stage():
+            factor1, factor2 = self.calculate_factors(a, period)
+            return {'factor1': factor1, 'factor2': factor2}
+        factors = self._timed(attempt, 'factors', factors_stage)
+        factor1, factor2 = factors['factor1'], factors['factor2']
+        if factor1 and factor2 and factor1 * factor2 == self.n:
+            attempt.success, attempt.factors, attempt.method = True, (factor1, factor2), 'shor'
+            self.record_result(a, period, attempt.factors)
+        else:
+            attempt.failure_reason = 'trivial_factors'
+        return attempt
+
+    @instrumented('runner.run', lambda runner: {'n': runner.n})
+    def run(self):
+        """
+        Factorise N de bout en bout, en essayant de nouvelles bases tant que
+        nécessaire (jusqu'à max_attempts).
+
+        Returns:
+            ShorResult: Le résultat structuré (étapes, tentatives, durées)
+        """
+        if self.seed is not None:
+            random.seed(self.seed)
+            np.random.seed(self.seed)
+        start = time.perf_counter()
+        result = ShorResult(self.n)
+        result.preprocessing = self.preprocess()
+
+        if not result.preprocessing.output['is_valid']:
+            # N pair, puissance parfaite ou facteur bon marché : factorisé sans étape quantique
+            factors = result.preprocessing.output['factors']
+            if factors:
+                result.success, result.factors, result.method = True, tuple(sorted(factors)), 'classical'
+            result.total_duration = time.perf_counter() - start
+            return result
+
+        known = self.known_factors()
+        if known is not None:
+            # N déjà factorisé par une exécution précédente
+            result.success, result.factors, result.method = True, tuple(known['factors']), 'store'
+            result.total_duration = time.perf_counter() - start
+            return result
+
+        for a in itertools.islice(self.base_scheduler(), self.max_attempts):
+            attempt = self.run_attempt(a)
+            result.attempts.append(attempt)
+            if attempt.success:
+                result.success = True
+                result.factors = tuple(sorted(attempt.factors))
+                result.method = attempt.method
+                break
+
+        result.total_duration = time.perf_counter() - start
+        return result
@@ -0,0 +1,90 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from auto_run import AutoRun
+from shor_runner import AttemptResult
+
+
+@pytest.fixture
+def executor():
+    executor = ThreadPoolExecutor(max_workers=2)
+    yield executor
+    executor.shutdown(wait=True)
+
+
+@pytest.mark.parametrize('n', [15, 91])
+def test_success(executor, n):
+    run = AutoRun(n, range(2, n), seed=1).submit(executor)
+    assert run.wait(timeout=30)
+    assert run.status == 'success'
+    assert run.factors[0] * run.factors[1] == n
+    assert run.method is not None
+
+
+def test_failure_when_bases_exhausted(executor):
+    # 14 ≡ -1 (mod 15) : période 2, mais a^(r/2) ≡ -1
+    run = AutoRun(15, [14], seed=1).submit(executor)
+    assert run.wait(timeout=30)
+    assert run.status == 'failure'
+    assert run.error
+    assert [entry['a'] for entry in run.snapshot()['attempts']] == [14]
+
+
+def _blocking_attempts(run, started, release):
+    """Remplace run_attempt par une tentative qui attend release ou l'annulation."""
+    def run_attempt(a, cancelled=None):
+        started.append(a)
+        attempt = AttemptResult(a)
+        while not release.wait(0.01):
+            if cancelled is not None and cancelled.is_set():
+                attempt.failure_reason = 'cancelled'
+                return attempt
+        attempt.failure_reason = 'period_not_found'
+        return attempt
+    run.runner.run_attempt = run_attempt
+
+
+def test_cancel_stops_running_and_queued_attempts():
+    executor = ThreadPoolExecutor(max_workers=1)
+    started = []
+    release = threading.Event()
+    run = AutoRun(91, range(2, 91), seed=1)
+    _blocking_attempts(run, started, release)
+    run.submit(executor)
+    try:
+        while not started:
+            threading.Event().wait(0.01)
+        run.cancel()
+        assert run.wait(timeout=5)
+        assert run.status == 'cancelled'
+        # La seconde tentative, en attente dans le pool, n'a jamais démarré
+        assert started == [started[0]]
+    finally:
+        release.set()
+        executor.shutdown(wait=True)
+
+
+def test_concurrency_bounded_by_shared_pool():
+    executor = ThreadPoolExecutor(max_workers=2)
+    started = []
+    release = threading.Event()
+    runs = [AutoRun(91, range(2, 91), seed=1, parallel_attempts=2) for _ in range(3)]
+    for run in runs:
+        _blocking_attempts(run, started, release)
+        run.submit(executor)
+    try:
+        while len(started) < 2:
+            threading.Event().wait(0.01)
+        threading.Event().wait(0.1)
+        # 3 exécutions de 2 tentatives chacune, mais seulement 2 threads
+        assert len(started) == 2
+    finally:
+        for run in runs:
+            run.cancel()
+        for run in runs:
+            assert run.wait(timeout=5)
+        release.set()
+        executor.shutdown(wait=True)
+    assert {run.status for run in runs} == {'cancelled'}
@@ -0,0 +1,44 @@
+import numpy as np
+import pytest
+
+from classical.order import multiplicative_order
+from quantum.analytic_state import PeriodicState
+from quantum.quantum_register import QuantumRegister
+
+NUM_QUBITS = 6
+
+
+@pytest.mark.parametrize('a, n', [(7, 15), (2, 21)])
+def test_circuit_oracle_matches_periodic_mixture(a, n):
+    Q = 2**NUM_QUBITS
+    r = multiplicative_order(a, n)
+    offsets = {pow(a, x0, n): x0 for x0 in range(r)}
+    # Mélange exact : x0 pondéré par le nombre de termes de son état périodique
+    weights = {x0: PeriodicState(Q, x0, r).count / Q for x0 in range(r)}
+    expected = sum(weight * PeriodicState(Q, x0, r).fourier_probabilities() for x0, weight in weights.items())
+
+    register = QuantumRegister(NUM_QUBITS)
+    register.apply_hadamard_to_all()
+    register.apply_modular_exponentiation(a, n)
+    work_probabilities = register.get_work_register_probabilities()
+    for value, x0 in offsets.items():
+        assert work_probabilities[value] == pytest.approx(weights[x0], abs=1e-12)
+
+    # Chaque résultat du registre de travail donne l'état périodique de son x0
+    mixture = np.zeros(Q)
+    seen = set()
+    seed = 0
+    while len(seen) < r:
+        np.random.seed(seed)
+        seed += 1
+        register = QuantumRegister(NUM_QUBITS)
+        register.apply_hadamard_to_all()
+        register.apply_oracle(a, n, mode='circuit')
+        register.apply_iqft()
+        x0 = offsets[register.work_register_value]
+        probabilities = register.get_probabilities()
+        np.testing.assert_allclose(probabilities, PeriodicState(Q, x0, r).fourier_probabilities(), atol=1e-12)
+        if x0 not in seen:
+            seen.add(x0)
+            mixture += work_probabilities[register.work_register_value] * probabilities
+    np.testing.assert_allclose(mixture, expected, atol=1e-12)
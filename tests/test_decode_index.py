@@ -0,0 +1,74 @@
+import random
+from collections import Counter
+
+import numpy as np
+import pytest
+
+from classical import decode_index
+from classical.decode_index import decode_periods, get_decode_index
+from quantum.analytic_state import PeriodicState
+from quantum.quantum_register import QuantumRegister
+from shor_runner import ShorRunner
+
+CASES = [(2, 15, 8), (7, 15, 8), (2, 21, 9), (2, 91, 14), (5, 91, 14), (3, 143, 15)]
+
+
+@pytest.fixture(autouse=True)
+def empty_decode_cache():
+    # find_period lit la table si elle est en cache : on part d'un cache vide
+    with decode_index._cache_lock:
+        decode_index._cache.clear()
+    yield
+    with decode_index._cache_lock:
+        decode_index._cache.clear()
+
+
+@pytest.mark.parametrize('a, n, num_qubits', CASES)
+def test_index_matches_scalar_find_period(a, n, num_qubits):
+    runner = ShorRunner(n)
+    scalar = [runner.find_period(a, s, num_qubits)[0] for s in range(2**num_qubits)]
+    index = get_decode_index(a, n, num_qubits)
+    assert [index.period(s) for s in range(2**num_qubits)] == scalar
+
+
+def test_decode_periods_rejects_int64_overflow():
+    with pytest.raises(ValueError):
+        decode_periods([1], 2**40, 2**24, 6)
+
+
+def _simulated_distribution(a, n, num_qubits):
+    """
+    Distribution des mesures du simulateur dense, x0 par x0 : même loi de x0
+    que apply_oracle, puis conditionnement sur une mesure non nulle.
+    """
+    Q, r = 2**num_qubits, ShorRunner(n).order(a)
+    distribution = np.zeros(Q)
+    for x0 in range(r):
+        register = QuantumRegister(num_qubits)
+        register.state = PeriodicState(Q, x0, r).to_dense()
+        register.apply_iqft()
+        probabilities = register.get_probabilities().astype(np.float64)
+        probabilities[0] = 0.0
+        distribution += len(range(x0, Q, r)) / Q * probabilities / probabilities.sum()
+    return distribution
+
+
+@pytest.mark.parametrize('a, n, num_qubits', [(2, 21, 9), (2, 91, 14), (5, 91, 14)])
+def test_index_probabilities_match_dense_simulator(a, n, num_qubits):
+    index = get_decode_index(a, n, num_qubits)
+    expected = _simulated_distribution(a, n, num_qubits)
+    assert np.allclose(index.probabilities(np.arange(index.Q)), expected, atol=1e-9)
+
+
+def test_oracle_offset_follows_term_count():
+    # Q = 16, r = 6 : x0 ∈ {0..3} a 3 termes, x0 ∈ {4, 5} en a 2
+    random.seed(0)
+    counts = Counter()
+    for _ in range(20000):
+        register = QuantumRegister(4, backend='analytic')
+        register.apply_hadamard_to_all()
+        register.apply_oracle(2, 9)
+        counts[register.periodic_state.x0] += 1
+    for x0 in range(6):
+        expected = (3 if x0 < 4 else 2) / 16
+        assert abs(counts[x0] / 20000 - expected) < 0.01
@@ -0,0 +1,50 @@
+import numpy as np
+import pytest
+
+from classical.order import multiplicative_order
+from quantum.analytic_state import PeriodicState
+from quantum.iterative_phase_estimation import (create_iterative_register, iterative_phase_estimation,
+                                                work_register_qubits)
+
+SAMPLES = 2000
+
+
+def _standard_probabilities(a, n, num_bits):
+    """
+    Distribution de la mesure du registre de comptage complet après l'IQFT :
+    mélange des états périodiques, pondérés par le nombre de termes de chacun.
+    """
+    Q = 2**num_bits
+    r = multiplicative_order(a, n)
+    probabilities = np.zeros(Q)
+    for x0 in range(r):
+        state = PeriodicState(Q, x0, r)
+        probabilities += state.count / Q * state.fourier_probabilities()
+    return probabilities
+
+
+@pytest.mark.parametrize('a, n', [(7, 15), (2, 21)])
+def test_distribution_matches_standard_estimation(a, n):
+    num_bits = 5
+    np.random.seed(0)
+    register = create_iterative_register(n)
+    samples = [iterative_phase_estimation(register, a, n, num_bits) for _ in range(SAMPLES)]
+    histogram = np.bincount(samples, minlength=2**num_bits) / SAMPLES
+    distance = 0.5 * np.abs(histogram - _standard_probabilities(a, n, num_bits)).sum()
+    # Bruit d'échantillonnage : environ 0.03 (7, 15) et 0.05 (2, 21) ;
+    # bits lus dans l'ordre inverse : 0.75 et 0.45
+    assert distance < 0.1
+
+
+@pytest.mark.parametrize('k', [1, 3])
+def test_eigenstate_gives_its_phase(k):
+    # 7 est d'ordre 4 modulo 15 : |u_k> = Σ_j e^{-2iπ jk/4} |7^j> a la phase k/4
+    a, n, r, num_bits = 7, 15, 4, 6
+    work_state = np.zeros(2**work_register_qubits(n), dtype=complex)
+    for j in range(r):
+        work_state[pow(a, j, n)] = np.exp(-2j * np.pi * j * k / r) / np.sqrt(r)
+    register = create_iterative_register(n)
+    # Phase exacte : la mesure est déterministe, et une correction de phase
+    # de signe opposé donnerait 2^t - s
+    for _ in range(5):
+        assert iterative_phase_estimation(register, a, n, num_bits, work_state=work_state) == 2**num_bits * k // r
@@ -0,0 +1,87 @@
+"""
+Chemins parcourus par l'application pour un N proche de MAX_N : aucun ne doit
+dépendre linéairement de N ou de la période (ordre par la fonction de
+Carmichael, planificateur de bases, backend analytique).
+"""
+import os
+import random
+import time
+
+import numpy as np
+import pytest
+
+from classical.order import multiplicative_order
+from shor_runner import ShorRunner
+
+# 991 * 1009, juste sous MAX_N (app.py) ; ordre de 2 modulo N : 27720
+LARGE_N = 999919
+# 23 * 89 : premier N de l'application dont le registre (22 qubits) est analytique
+ANALYTIC_N = 2047
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def test_order_of_large_n():
+    multiplicative_order.cache_clear()
+    assert multiplicative_order(2, LARGE_N) == 27720
+    assert pow(2, 27720, LARGE_N) == 1
+    assert pow(2, 27720 // 2, LARGE_N) != 1
+
+
+def test_app_steps_for_large_n_stay_fast():
+    random.seed(0)
+    np.random.seed(0)
+    runner = ShorRunner(LARGE_N)
+    start = time.perf_counter()
+    a = runner.base_scheduler().next_base()
+    is_coprime, _ = runner.check_base(a)
+    register = runner.create_register(keep_state=True)
+    register.apply_hadamard_to_all()
+    runner.apply_oracle(register, a)
+    register.apply_iqft()
+    measurement = runner.measure(register)
+    runner.find_period(a, measurement, runner.num_qubits)
+    elapsed = time.perf_counter() - start
+
+    assert is_coprime
+    # 40 qubits : le vecteur d'état n'est jamais alloué
+    assert register.backend == 'analytic'
+    assert 0 < measurement < 2**runner.num_qubits
+    # Un parcours en O(N) prendrait plusieurs secondes
+    assert elapsed < 2.0
+
+
+def test_analytic_iqft_in_any_gate_order():
+    runner = ShorRunner(ANALYTIC_N)
+    register = runner.create_register(keep_state=True)
+    assert register.backend == 'analytic'
+    # IQFT de |0> : superposition uniforme, et réciproquement
+    register.apply_iqft()
+    assert register.get_probabilities()[1] == pytest.approx(2.0**-register.num_qubits)
+    register.apply_hadamard_to_all()
+    register.apply_iqft()
+    assert runner.measure(register) == 0
+    runner.apply_oracle(register, 3)
+    register.apply_iqft()
+    with pytest.raises(ValueError):
+        register.apply_iqft()
+    assert 0 < runner.measure(register) < 2**register.num_qubits
+
+
+def test_app_gate_buttons_out_of_order(monkeypatch):
+    testing = pytest.importorskip('streamlit.testing.v1')
+    monkeypatch.chdir(ROOT)
+    monkeypatch.setenv('SHOR_RESULT_STORE', ':memory:')
+    at = testing.AppTest.from_file(os.path.join(ROOT, 'app.py'), default_timeout=30).run()
+    at.sidebar.number_input[0].set_value(ANALYTIC_N).run()
+    # Base de période paire, pour atteindre l'étape 3
+    at.session_state.simulator.a = 3
+    for label in ["Vérifier la base et continuer", "Passer à l'étape 3 (Simulation Quantique)",
+                  "Appliquer IQFT", "Appliquer Hadamard", "Appliquer Oracle", "Appliquer IQFT", "Appliquer IQFT"]:
+        next(button for button in at.button if button.label == label).click().run()
+        assert not at.exception, (label, at.exception)
+    # La seconde IQFT après l'oracle est refusée par un avertissement, sans trace d'erreur
+    assert at.warning
+    next(button for button in at.button if button.label == "Mesurer").click().run()
+    assert not at.exception
+    assert at.session_state.simulator.measurement is not None
@@ -0,0 +1,40 @@
+import numpy as np
+import pytest
+
+import monte_carlo
+from monte_carlo import SuccessEstimate, estimate_success_rate, wilson_interval
+from shor_runner import ShorRunner
+
+
+def test_wilson_interval_stays_in_unit_range():
+    assert wilson_interval(0, 0) == (0.0, 1.0)
+    low, high = wilson_interval(0, 100)
+    assert low == 0.0 and 0 < high < 0.05
+    low, high = wilson_interval(50, 100)
+    assert low < 0.5 < high
+
+
+def test_trials_to_success_spans_batches():
+    estimate = SuccessEstimate(15, 7, 8)
+    estimate.add_batch(np.ones(4, bool), np.array([False, True, False, False]))
+    estimate.add_batch(np.ones(3, bool), np.array([False, True, True]))
+    # Succès aux essais 2, 6 et 7 : écarts de 2, 4 et 1 essais
+    assert estimate.trials == 7 and estimate.successes == 3
+    assert {k: int(c) for k, c in enumerate(estimate.trials_to_success) if c} == {1: 1, 2: 1, 4: 1}
+
+
+@pytest.mark.parametrize('n, a', [(91, 2), (91, 5), (143, 2)])
+def test_estimate_matches_exact_probability(n, a):
+    exact = ShorRunner(n).success_probability(a)
+    estimate = estimate_success_rate(n, a, trials=200000, confidence=0.999, seed=0)
+    low, high = estimate.interval
+    assert low <= exact <= high
+
+
+def test_rejection_sampler_matches_exact_probability(monkeypatch):
+    # Force le tirage par rejet (utilisé au-delà de 20 qubits) sur un petit registre
+    monkeypatch.setattr(monte_carlo, 'EXACT_SAMPLING_MAX_QUBITS', 0)
+    exact = ShorRunner(91).success_probability(2)
+    estimate = estimate_success_rate(91, 2, trials=200000, confidence=0.999, seed=1)
+    low, high = estimate.interval
+    assert low <= exact <= high
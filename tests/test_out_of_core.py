@@ -0,0 +1,59 @@
+import numpy as np
+import pytest
+
+from quantum import out_of_core
+from quantum.quantum_register import QuantumRegister
+
+
+def _random_state(num_qubits, seed=0):
+    rng = np.random.default_rng(seed)
+    state = rng.normal(size=2**num_qubits) + 1j * rng.normal(size=2**num_qubits)
+    return state / np.linalg.norm(state)
+
+
+@pytest.mark.parametrize('num_qubits', [1, 4, 5, 7, 10])
+@pytest.mark.parametrize('chunk_size', [1, 8, 32, 4096])
+def test_four_step_ifft_matches_numpy(num_qubits, chunk_size):
+    # Blocs plus petits, égaux ou plus grands que sqrt(Q) (32 pour 10 qubits)
+    Q = 2**num_qubits
+    x = _random_state(num_qubits, seed=num_qubits)
+    source = x.copy()
+    destination = np.empty_like(source)
+    out_of_core.four_step_ifft(source, destination, chunk_size)
+    np.testing.assert_allclose(destination, np.fft.ifft(x) * np.sqrt(Q), atol=1e-12)
+
+
+def test_four_step_ifft_on_memmap(tmp_path):
+    x = _random_state(9, seed=1)
+    source = out_of_core.create_state_file(x.size, np.complex128, str(tmp_path))
+    source[:] = x
+    destination = out_of_core.create_state_file(x.size, np.complex128, str(tmp_path))
+    out_of_core.four_step_ifft(source, destination, 16)
+    np.testing.assert_allclose(np.asarray(destination), np.fft.ifft(x) * np.sqrt(x.size), atol=1e-12)
+
+
+@pytest.mark.parametrize('chunk_size', [1, 4, 64, 1024])
+def test_memmap_register_matches_dense(tmp_path, chunk_size):
+    num_qubits = 7
+    dense = QuantumRegister(num_qubits)
+    memmap = QuantumRegister(num_qubits, storage='memmap', chunk_size=chunk_size, storage_dir=str(tmp_path))
+    x = _random_state(num_qubits, seed=2)
+    dense.state[:] = x
+    memmap.state[:] = x
+
+    for register in (dense, memmap):
+        register.apply_hadamard(0)
+        register.apply_hadamard(5)
+        register.apply_cnot(0, 3)
+        register.apply_cnot(6, 1)
+        register.apply_controlled_gate(np.array([[0, -1j], [1j, 0]]), [2, 4], 6)
+        register.apply_iqft()
+    np.testing.assert_allclose(np.asarray(memmap.state), dense.state, atol=1e-12)
+
+    # Mêmes tirages uniformes : la recherche par blocs donne les mêmes indices
+    for nonzero in (False, True):
+        np.random.seed(3)
+        expected = dense.measure(shots=500, nonzero=nonzero)
+        np.random.seed(3)
+        results = memmap.measure(shots=500, nonzero=nonzero)
+        np.testing.assert_array_equal(results, expected)
@@ -0,0 +1,64 @@
+import random
+
+import numpy as np
+
+from shor_runner import ShorRunner
+
+# Ordre de 2 modulo 91 : 12 ; Q = 2^14. 2731 ≈ 2Q/12 ne donne que 6 et
+# 4096 = 3Q/12 ne donne que 4 : seule leur combinaison donne 12.
+N, A, NUM_QUBITS = 91, 2, 14
+PARTIAL_MEASUREMENTS = [2731, 4096]
+
+
+def test_single_partial_measurement_is_not_enough():
+    runner = ShorRunner(N)
+    for measurement in PARTIAL_MEASUREMENTS:
+        assert runner.find_period(A, measurement, NUM_QUBITS)[0] is None
+
+
+def test_recover_period_combines_measurements():
+    period, confidence, candidates = ShorRunner(N).recover_period(A, PARTIAL_MEASUREMENTS, NUM_QUBITS)
+    assert period == 12
+    assert confidence == 1.0
+    assert 12 in candidates
+
+
+def test_recover_period_without_useful_denominator():
+    period, confidence, _ = ShorRunner(N).recover_period(A, [1], NUM_QUBITS)
+    assert period is None
+    assert confidence == 0.0
+
+
+def _scripted_runner(measurements, **options):
+    runner = ShorRunner(N, **options)
+    pending = list(measurements)
+    runner.run_quantum = lambda register, a, shots=None: pending.pop(0)
+    return runner
+
+
+def test_each_shot_is_a_quantum_execution():
+    attempt = _scripted_runner(PARTIAL_MEASUREMENTS).run_attempt(A)
+    names = [stage.name for stage in attempt.stages]
+    assert names == ['periodicity', 'quantum', 'period_finding', 'quantum', 'period_finding', 'factors']
+    assert attempt.success
+    assert sorted(attempt.factors) == [7, 13]
+    last = [stage for stage in attempt.stages if stage.name == 'period_finding'][-1].output
+    assert last['combined'] and last['measurements'] == PARTIAL_MEASUREMENTS
+
+
+def test_shots_bound_the_executions():
+    attempt = _scripted_runner([1, 1, 1], shots=3).run_attempt(A)
+    assert [stage.name for stage in attempt.stages].count('quantum') == 3
+    assert attempt.failure_reason == 'period_not_found'
+
+
+def test_iterative_mode_counts_executions_like_standard():
+    random.seed(1)
+    np.random.seed(1)
+    for phase_estimation in ('standard', 'iterative'):
+        attempt = ShorRunner(15, phase_estimation=phase_estimation).run_attempt(7)
+        executions = [stage for stage in attempt.stages if stage.name == 'quantum']
+        decodes = [stage for stage in attempt.stages if stage.name == 'period_finding']
+        assert 1 <= len(executions) <= 4
+        assert len(decodes) == len(executions)
+        assert len(decodes[-1].output['measurements']) == len(executions)
@@ -0,0 +1,56 @@
+import random
+
+import pytest
+from sympy import integer_nthroot, primerange
+
+from classical.preprocessing import Preprocessor, integer_root, pollard_rho, small_primes
+
+
+def test_small_primes():
+    assert small_primes(1000) == tuple(primerange(2, 1001))
+    assert small_primes(2) == (2,)
+
+
+@pytest.mark.parametrize('k', [2, 3, 5, 7, 13])
+@pytest.mark.parametrize('m', [2, 3, 10, 999, 2**31 - 1, 3**50])
+def test_integer_root_near_kth_powers(m, k):
+    power = m**k
+    assert integer_root(power - 1, k) == m - 1
+    assert integer_root(power, k) == m
+    assert integer_root(power + 1, k) == m
+
+
+def test_integer_root_matches_sympy():
+    rng = random.Random(0)
+    for _ in range(2000):
+        n = rng.getrandbits(rng.randrange(1, 200))
+        k = rng.randrange(1, 20)
+        assert integer_root(n, k) == integer_nthroot(n, k)[0]
+    with pytest.raises(ValueError):
+        integer_root(-8, 3)
+
+
+@pytest.mark.parametrize('base, exponent', [(3, 2), (15, 7), (3, 40), (6, 9)])
+def test_perfect_powers_with_any_exponent(base, exponent):
+    n = base**exponent
+    preprocessor = Preprocessor(n)
+    assert not preprocessor.validate_number()
+    a, b = preprocessor.factors
+    assert 1 < a < n and a * b == n
+
+
+def test_pollard_rho_returns_proper_divisors():
+    for n in (8051, 10403, 1009 * 1013, 104723 * 104729):
+        factor = pollard_rho(n)
+        assert factor is not None and 1 < factor < n and n % factor == 0
+
+
+def test_pollard_rho_only_with_factor_shortcuts():
+    # Deux facteurs au-delà de SMALL_PRIME_LIMIT : seule Pollard rho les trouve
+    n = 1009 * 1013
+    with_shortcuts = Preprocessor(n, factor_shortcuts=True)
+    assert not with_shortcuts.validate_number()
+    assert sorted(with_shortcuts.factors) == [1009, 1013]
+    assert "Pollard rho" in with_shortcuts.get_validation_steps()[-1]
+
+    assert Preprocessor(n).validate_number()
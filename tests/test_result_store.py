@@ -0,0 +1,73 @@
+import sqlite3
+
+import pytest
+
+from result_store import ResultStore
+from shor_runner import ShorRunner
+
+
+@pytest.fixture
+def path(tmp_path):
+    return str(tmp_path / 'results.sqlite3')
+
+
+def test_round_trip(path):
+    store = ResultStore(path)
+    store.put_period(91, 2, 14, 'double', 12)
+    store.put_factors(91, (13, 7), 'shor', 2)
+    assert store.get_period(91, 2, 14, 'double') == 12
+    assert store.get_period(91, 2, 14, 'single') is None
+    assert store.get_factors(91) == {'factors': [7, 13], 'method': 'shor', 'a': 2}
+    assert len(store) == 2
+
+
+def test_reads_do_not_write(path):
+    store = ResultStore(path)
+    store.put_factors(15, (3, 5), 'shor', 7)
+    changes = store._connection.total_changes
+    for _ in range(10):
+        assert store.get_factors(15) is not None
+    assert store._connection.total_changes == changes
+
+
+def test_version_change_clears_entries(path):
+    store = ResultStore(path, version=1)
+    store.put_factors(15, (3, 5), 'shor', 7)
+    store.close()
+    assert len(ResultStore(path, version=1)) == 1
+    assert ResultStore(path, version=2).get_factors(15) is None
+
+
+def test_eviction_keeps_recently_read_entries(path):
+    store = ResultStore(path, max_bytes=600)
+    for n in range(15, 35, 2):
+        store.put_factors(n, (1, n), 'shor', 2)
+    # La plus ancienne entrée encore présente est relue : elle devient la plus récente
+    oldest = next(n for n in range(15, 35, 2) if store.get_factors(n) is not None)
+    for n in range(35, 45, 2):
+        store.put_factors(n, (1, n), 'shor', 2)
+    sizes = store._connection.execute('SELECT SUM(size) FROM results').fetchone()[0]
+    assert sizes <= 600
+    assert store.get_factors(oldest) is not None
+    assert store.get_factors(43) is not None
+
+
+class LockedStore:
+    def __getattr__(self, name):
+        def locked(*args):
+            raise sqlite3.OperationalError('database is locked')
+        return locked
+
+
+def test_runner_falls_back_when_store_is_locked(capsys):
+    result = ShorRunner(15, store=LockedStore(), seed=0).run()
+    assert result.success and result.method in ('shor', 'gcd')
+    assert 'indisponible' in capsys.readouterr().out
+
+
+def test_runner_reuses_stored_factors(path):
+    store = ResultStore(path)
+    first = ShorRunner(91, store=store, seed=0).run()
+    assert first.success and first.method in ('shor', 'gcd')
+    second = ShorRunner(91, store=store, seed=1).run()
+    assert second.method == 'store' and second.factors == first.factors
@@ -0,0 +1,57 @@
+import random
+
+import numpy as np
+import pytest
+
+from quantum.quantum_register import QuantumRegister
+from quantum.sparse_state import SparseState
+
+
+def test_periodic_matches_dense():
+    state = SparseState.periodic(64, 3, 10)
+    dense = np.zeros(64, dtype=np.complex128)
+    dense[3::10] = 1 / np.sqrt(7)
+    assert np.allclose(state.to_dense(), dense)
+    assert len(SparseState.from_dense(dense)) == 7
+
+
+def test_sample_inverts_the_same_cdf_as_dense():
+    state = SparseState.periodic(256, 5, 12)
+    dense_cdf = np.cumsum(np.abs(state.to_dense())**2)
+    sparse = state.sample(2000, np.random.default_rng(7))
+    u = np.random.default_rng(7).random(2000) * dense_cdf[-1]
+    assert np.array_equal(sparse, np.searchsorted(dense_cdf, u, side='right'))
+
+
+def test_nonzero_sample_skips_zero():
+    state = SparseState(8, [0, 3], [np.sqrt(0.9), np.sqrt(0.1)])
+    assert set(state.sample(200, np.random.default_rng(0), nonzero=True).tolist()) == {3}
+    # Sans autre amplitude, |0> reste la seule mesure possible
+    assert set(SparseState.basis(8, 0).sample(5, np.random.default_rng(0), nonzero=True).tolist()) == {0}
+
+
+def test_empty_state_cannot_be_sampled():
+    empty = SparseState.from_dense(np.zeros(16))
+    assert len(empty) == 0
+    with pytest.raises(ValueError):
+        empty.sample(1, np.random.default_rng(0))
+
+
+def _run(backend, num_qubits, a, n, seed):
+    random.seed(seed)
+    register = QuantumRegister(num_qubits, backend=backend)
+    register.apply_hadamard_to_all()
+    register.apply_oracle(a, n)
+    after_oracle = register.get_probabilities().astype(np.float64)
+    register.apply_iqft()
+    return register, after_oracle, register.get_probabilities().astype(np.float64)
+
+
+@pytest.mark.parametrize('a, n', [(2, 15), (7, 15), (2, 21)])
+def test_sparse_register_matches_dense(a, n):
+    num_qubits = (n**2 - 1).bit_length()
+    sparse, sparse_oracle, sparse_fourier = _run('sparse', num_qubits, a, n, seed=3)
+    dense, dense_oracle, dense_fourier = _run('dense', num_qubits, a, n, seed=3)
+    assert np.allclose(sparse_oracle, dense_oracle)
+    assert np.allclose(sparse_fourier, dense_fourier)
+    assert str(sparse) == str(dense)